@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+class AggregatePlot():
+    
+    def __init__(self, _params):
+        
+        m = _params['m']
+        a = _params['a']
+        layer = _params['layer']
+        layerdetails = _params["layerdetails"]
+        
+        layerId = []
+        if layer == 'All':
+            layerId = list(range(m['nlayers']))
+        else:
+            layerId.append(int(layer)-1)
+            
+        # the state columns of the selected layers and variables
+        nKeys = len(a['keys'])
+        columns = []
+        for l in layerId:
+            for i, k in enumerate(a['keys']):
+                if layerdetails[k]:
+                    columns.append(l * nKeys + i)
+        
+        nplots = 4 + len(columns)
+        wW = 8                
+        wH = 12
+        eT = a['time']
+        
+        fig, axes = plt.subplots(constrained_layout=False, nrows=nplots, ncols=1, figsize=(wW, wH))                           
+        fig.canvas.set_window_title('Agent {} - {} experiments (mean and {:.0f}% CI)'.format(m['name'], len(a['runs']), _params['confidence'] * 100))
+        fig.subplots_adjust(wspace=0.1, hspace=1.0)
+        
+        for i in range (nplots):
+            ax = axes[i]
+            ax.ticklabel_format(style='sci', axis='y', scilimits=(0,0))
+            ax.get_yaxis().set_major_locator(plt.MaxNLocator(2))
+            ax.get_xaxis().set_visible(i == nplots - 1)
+         
+        plt.rc('font', size=7)
+        titleX = 0.5
+        titleY = 1.0
+        font = {'family': 'serif',
+                'color':  'darkred',
+                'weight': 'bold',
+                'size': 8,
+                }        
+        
+        titles = ['N-ELBO', 'Reconstruction error', 'Regulation error (KL-Divergence)']
+        for i in range(3):
+            axes[i].set_title(titles[i], x=titleX, y=titleY, fontdict=font)
+            self.plotBand(axes[i], eT, a['elbo_mean'][:,i], a['elbo_ci'][:,i])
+        
+        axes[3].set_title('Mean squared error', x=titleX, y=titleY, fontdict=font)
+        self.plotBand(axes[3], eT, a['mse_mean'], a['mse_ci'])
+        
+        for i, c in enumerate(columns):
+            axes[4+i].set_title('{}, mean over the neurons'.format(a['labels'][c]), x=titleX, y=titleY, fontdict=font)
+            self.plotBand(axes[4+i], eT, a['state_mean'][:,c], a['state_ci'][:,c])
+        
+        axes[-1].set_xlabel('Time (s)')
+        plt.show()
+            
+    def plotBand(self, _ax, _times, _mean, _ci):
+        
+        _ax.plot(_times, _mean)
+        _ax.fill_between(_times, _mean - _ci, _mean + _ci, alpha=0.3)
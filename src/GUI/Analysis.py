@@ -53,7 +53,7 @@ import tkinter as tk
 from tkinter import ttk
 import numpy as np
 import math
-import statistics
+import sqlite3
 import matplotlib.pyplot as plt
 
 from matplotlib.backends.backend_tkagg import (
@@ -67,7 +67,11 @@ import matplotlib.gridspec as gridspec
 
 from GUI.Message import Message
 from GUI.AnalysisPlot import AnalysisPlot
+from GUI.AggregatePlot import AggregatePlot
+from GUI.LatentPlot import LatentPlot
 from GUI.Layer import Layer
+from tools.stats import ExperimentStatistics
+from tools.aggregate import ExperimentAggregate
 
 class Analysis():
         
@@ -107,6 +111,7 @@ class Analysis():
 
         self.m = None
         self.e = None
+        self.catalog = None
                     
         f_padx = self.context['f_padx']
         padx_ = self.context['padx']
@@ -123,12 +128,14 @@ class Analysis():
         self.f_t1_f1_f1 = ttk.LabelFrame(self.f_t1_f1, relief=tk.SUNKEN, text=" Selection ")                                
         self.l_t1_f1_f1_N = ttk.Label(self.f_t1_f1_f1, text="Model:")
         self.l_t1_f1_f1_D = ttk.Label(self.f_t1_f1_f1, text="Dataset:")       
+        self.l_t1_f1_f1_Q = ttk.Label(self.f_t1_f1_f1, text="Filter:")        
         self.l_t1_f1_f1_E = ttk.Label(self.f_t1_f1_f1, text="Experiment:")        
         self.l_t1_f1_f1_L = ttk.Label(self.f_t1_f1_f1, text="Layer:")        
         self.l_t1_f1_f1_P = ttk.Label(self.f_t1_f1_f1, text="Parameters:")        
         self.l_t1_f1_f1_F = ttk.Label(self.f_t1_f1_f1, text="Format:")        
         self.l_t1_f1_f1_Nv = ttk.Label(self.f_t1_f1_f1, text="               ")
         self.l_t1_f1_f1_Dv = ttk.Label(self.f_t1_f1_f1, text="               ")        
+        self.e_t1_f1_f1_Q = ttk.Entry(self.f_t1_f1_f1, width= 32)        
         self.c_t1_f1_f1_E = ttk.Combobox(self.f_t1_f1_f1, values=['empty'], width= 30, state="readonly")        
         self.c_t1_f1_f1_L = ttk.Combobox(self.f_t1_f1_f1, values=['empty'], width= 30, state="readonly")        
         self.b_t1_f1_f1_P = ttk.Button(self.f_t1_f1_f1, text="Select", command=self.doParamSelect)        
@@ -136,17 +143,21 @@ class Analysis():
 
         self.l_t1_f1_f1_N.grid(row=0, column=0, padx=padx_, pady=pady_,  sticky=tk.E)        
         self.l_t1_f1_f1_D.grid(row=1, column=0, padx=padx_, pady=pady_,  sticky=tk.E)
-        self.l_t1_f1_f1_E.grid(row=2, column=0, padx=padx_, pady=pady_,  sticky=tk.E)        
-        self.l_t1_f1_f1_L.grid(row=3, column=0, padx=padx_, pady=pady_,  sticky=tk.E)        
-        self.l_t1_f1_f1_P.grid(row=4, column=0, padx=padx_, pady=pady_,  sticky=tk.E)        
-        self.l_t1_f1_f1_F.grid(row=5, column=0, padx=padx_, pady=pady_,  sticky=tk.E)        
+        self.l_t1_f1_f1_Q.grid(row=2, column=0, padx=padx_, pady=pady_,  sticky=tk.E)        
+        self.l_t1_f1_f1_E.grid(row=3, column=0, padx=padx_, pady=pady_,  sticky=tk.E)        
+        self.l_t1_f1_f1_L.grid(row=4, column=0, padx=padx_, pady=pady_,  sticky=tk.E)        
+        self.l_t1_f1_f1_P.grid(row=5, column=0, padx=padx_, pady=pady_,  sticky=tk.E)        
+        self.l_t1_f1_f1_F.grid(row=6, column=0, padx=padx_, pady=pady_,  sticky=tk.E)        
         self.l_t1_f1_f1_Nv.grid(row=0, column=1, padx=padx_, pady=pady_,  sticky=tk.W)        
         self.l_t1_f1_f1_Dv.grid(row=1, column=1, padx=padx_, pady=pady_,  sticky=tk.W)        
-        self.c_t1_f1_f1_E.grid(row=2, column=1, padx=padx_, pady=pady_,  sticky=tk.W)
-        self.c_t1_f1_f1_L.grid(row=3, column=1, padx=padx_, pady=pady_,  sticky=tk.W)
-        self.b_t1_f1_f1_P.grid(row=4, column=1, padx=padx_, pady=pady_,  sticky=tk.W)
-        self.c_t1_f1_f1_F.grid(row=5, column=1, padx=padx_, pady=pady_,  sticky=tk.W)
-        
+        self.e_t1_f1_f1_Q.grid(row=2, column=1, padx=padx_, pady=pady_,  sticky=tk.W)
+        self.c_t1_f1_f1_E.grid(row=3, column=1, padx=padx_, pady=pady_,  sticky=tk.W)
+        self.c_t1_f1_f1_L.grid(row=4, column=1, padx=padx_, pady=pady_,  sticky=tk.W)
+        self.b_t1_f1_f1_P.grid(row=5, column=1, padx=padx_, pady=pady_,  sticky=tk.W)
+        self.c_t1_f1_f1_F.grid(row=6, column=1, padx=padx_, pady=pady_,  sticky=tk.W)
+        
+        # e.g. 'primitiveid=2; postdiction=True; elbo_mean<10', applied with Enter
+        self.e_t1_f1_f1_Q.bind("<Return>", self.doFilter)
         self.c_t1_f1_f1_E.bind("<<ComboboxSelected>>", self.doComboExperiment)
         self.c_t1_f1_f1_L.bind("<<ComboboxSelected>>", self.doComboLayer)
         self.c_t1_f1_f1_F.bind("<<ComboboxSelected>>", self.doComboFormat)
@@ -159,10 +170,14 @@ class Analysis():
         self.b_t1_f1_f2_Plot = ttk.Button(self.f_t1_f1_f2, text="Plot",  command=self.doPlot)        
         self.b_t1_f1_f2_Export = ttk.Button(self.f_t1_f1_f2, text="Export to CSV",  command=self.doExport)        
         self.b_t1_f1_f2_Remove = ttk.Button(self.f_t1_f1_f2, text="Remove",  command=self.doRemove)        
+        self.b_t1_f1_f2_Aggregate = ttk.Button(self.f_t1_f1_f2, text="Aggregate",  command=self.doAggregate)        
+        self.b_t1_f1_f2_PCA = ttk.Button(self.f_t1_f1_f2, text="PCA",  command=self.doPCA)        
         self.b_t1_f1_f2_Statistics.grid(row=0, column=0, padx=padx_, pady=pady_,  sticky=tk.N)
         self.b_t1_f1_f2_Plot.grid(row=0, column=1, padx=padx_, pady=pady_,  sticky=tk.N)
         self.b_t1_f1_f2_Export.grid(row=0, column=2, padx=padx_, pady=pady_,  sticky=tk.N)
         self.b_t1_f1_f2_Remove.grid(row=0, column=3, padx=padx_, pady=pady_,  sticky=tk.N)
+        self.b_t1_f1_f2_Aggregate.grid(row=0, column=4, padx=padx_, pady=pady_,  sticky=tk.N)
+        self.b_t1_f1_f2_PCA.grid(row=0, column=5, padx=padx_, pady=pady_,  sticky=tk.N)
         self.f_t1_f1_f2.grid(columnspan=2)        
         self.f_t1_f1_f1.pack(side=tk.TOP, expand=1, fill=tk.X, padx=f_padx, pady=10, anchor=tk.N)
                                 
@@ -195,6 +210,11 @@ class Analysis():
         self.e = self.ut.parseExperiment(basedir)
         self.messenger.logConsole("Experiment \'{}\' selected!".format(eName))
         
+    def doFilter(self, event):
+        
+        self.updateControls()
+        self.messenger.logConsole("{} experiment(s) found".format(len(self.c_t1_f1_f1_E["values"])))
+        
     def doComboLayer(self, event):
         
         lName = self.c_t1_f1_f1_L.get() 
@@ -206,11 +226,37 @@ class Analysis():
         self.messenger.logConsole("Format \'{}\' selected!".format(fName))
 
 
+    def getCatalog(self):
+        
+        # opened on first use, so that an unusable catalog only disables the
+        # filter instead of the whole tab
+        if self.catalog is None:
+            self.catalog = self.ut.getCatalog(self.experimentDir)
+        return self.catalog
+
+    def listExperiments(self, _basedir):
+        
+        # the folder names are compared with the catalog, the experiments are
+        # listed and filtered from the catalog without opening them
+        try:
+            catalog = self.getCatalog()
+            catalog.sync(_basedir, self.m['name'], self.ut)
+            conditions = catalog.parseFilter(self.e_t1_f1_f1_Q.get())
+            return catalog.list(self.m['name'], conditions)
+        except ValueError as err:
+            self.messenger.doWarning("Error: the filter is not valid, {}".format(err))
+        except sqlite3.Error as err:
+            self.messenger.logConsole("Warning: the experiment catalog is not available ({})".format(err))
+        eList = self.ut.getDirList(_basedir)
+        if eList is None:
+            eList = []
+        return eList
+
     def updateControls(self, reset=False):
         
         if not self.m is None:
             basedir = self.experimentDir + '/' + self.m['name']
-            eList = self.ut.getDirList(basedir)            
+            eList = self.listExperiments(basedir)
             st = tk.NORMAL
             self.c_t1_f1_f1_E["values"] = eList
             if len(eList) > 0:
@@ -227,6 +273,8 @@ class Analysis():
             self.b_t1_f1_f2_Plot.configure(state=st)        
             self.b_t1_f1_f2_Export.configure(state=st)       
             self.b_t1_f1_f2_Remove.configure(state=st)        
+            self.b_t1_f1_f2_Aggregate.configure(state=st)        
+            self.b_t1_f1_f2_PCA.configure(state=st)        
     
             if reset:
                 layerList = ['All']
@@ -246,45 +294,6 @@ class Analysis():
             self.messenger.doWarning("Error: no experiment selected!")
             return
         
-        state = np.float64(self.e['states'])
-        elbo = np.float64(self.e['elbo'])
-        
-        self.experimentKeys = ['datetime',\
-                              'model',
-                              'dataset',
-                              'numbertimes',
-                              'samplingperiod',                              
-                              'primitiveid',
-                              'windowSize',
-                              'w',
-                              'postdiction',
-                              'epochs',
-                              'alpha',
-                              'beta1',
-                              'beta2']
-
-
-        samplingperiod = int(self.e['samplingperiod'])
-        time_ = int(self.e['numbertimes'])*samplingperiod/1000.0
-        msg =       'Experiment Results\n'
-        msg = msg + '====================\n'
-        msg = msg + '{:<12}{:<15}{:<12}{:<12}{:<12}{:<12}{:<12}\n'.format('Context','Variable', 'Neuron', 'Dist.','Sum','Mean','stdev')
-        msg = msg + '------------------------------------------------------------------------------------\n'
-        context = 'Global'            
-        msg = msg + '{:<12}{:<15}{:<12}{:<12}{:<12}{:<12}{:<12}\n'.format(context,'Time(s)','', '',time_,'','')
-        sum_ = np.sum(elbo[:,0])
-        mean_ = statistics.mean(elbo[:,0])
-        stdev_ = statistics.stdev(elbo[:,0]) 
-        msg = msg + '{:<12}{:<15}{:<12}{:<12}{:<12,.3f}{:<12,.3f}{:<12,.3f}\n'.format(context,'ELBO', '', '', sum_, mean_, stdev_)
-        sum_ = np.sum(elbo[:,1])
-        mean_ = statistics.mean(elbo[:,1])
-        stdev_ = statistics.stdev(elbo[:,1]) 
-        msg = msg + '{:<12}{:<15}{:<12}{:<12}{:<12,.3f}{:<12,.3f}{:<12,.3f}\n'.format(context,'Reconstruction','', '', sum_, mean_, stdev_)
-        sum_ = np.sum(elbo[:,2])
-        mean_ = statistics.mean(elbo[:,2])
-        stdev_ = statistics.stdev(elbo[:,2]) 
-        msg = msg + '{:<12}{:<15}{:<12}{:<12}{:<12,.3f}{:<12,.3f}{:<12,.3f}\n'.format(context,'Regulation','', '', sum_, mean_, stdev_)
-        
         d = []
         for _d in self.ut.trimString(self.m['d']).split(self.delimiter):
             d.append(int(_d))
@@ -292,40 +301,13 @@ class Analysis():
         for _z in self.ut.trimString(self.m['z']).split(self.delimiter):
             z.append(int(_z))
         
-        layerData_list = []
-        for l in range(self.m['nlayers']):
-            iterators = [d[l],d[l],z[l],z[l],z[l],z[l],z[l],d[l],d[l],z[l],z[l],z[l],z[l],z[l]]
-            labels = ['d', 'h', '\u03BC', 'log \u03C3', '\u03C3', '\u03B5', 'z', 'd', 'h', '\u03BC', 'log \u03C3', '\u03C3', '\u03B5','z']            
-
-            h = 0
-            layerData_l_list = []
-            k = 0
-            for i in iterators:
-                for j in range(i):
-                    jh = j + h
-                    sum_ = np.sum(state[:,jh])
-                    mean_ = statistics.mean(state[:,jh])
-                    stdev_ = statistics.stdev(state[:,jh]) 
-                    #layerMap = {'k':'{}{}'.format(prefix[k],j),'s':sum_, 'm':mean_, 'sd':stdev_}
-                    dist_ = 'Prior'
-                    if k >= 7:
-                        dist_ = 'Posterior'
-                    layerMap = {'k':labels[k],'n':j+1,'dist': dist_, 's':sum_, 'm':mean_, 'sd':stdev_}
-                    layerData_l_list.append(layerMap)
-                h = h + i
-                k = k + 1
-            layerData_list.append(layerData_l_list)
-        
-        for l in range(self.m['nlayers']):
-            msg = msg + '------------------------------------------------------------------------------------\n'
-            list_l = layerData_list[l]
-            for v in range(len(list_l)):
-                context = 'Layer #{}'.format(l+1)
-                map_ = list_l[v]
-                msg = msg + '{:<12}{:<15}{:<12}{:<12}{:<12,.3f}{:<12,.3f}{:<12,.3f}\n'.format(context,map_['k'],map_['n'], map_['dist'], map_['s'], map_['m'], map_['sd'])
-
-        msg = msg + '====================\n'
-
+        samplingperiod = int(self.e['samplingperiod'])
+        time_ = int(self.e['numbertimes'])*samplingperiod/1000.0
+        
+        # all the columns are reduced at once, the report is rendered from the table
+        stats = ExperimentStatistics(d, z)
+        table = stats.compute(self.e['states'], self.e['elbo'])
+        msg = stats.render(table, time_)
         
         self.messenger.logConsole(msg,False,False)
         
@@ -348,6 +330,62 @@ class Analysis():
         AnalysisPlot(params)
         
 
+    def doAggregate(self):
+        
+        # every experiment listed with the current filter
+        eList = list(self.c_t1_f1_f1_E["values"])
+        if self.m is None or len(eList) == 0:
+            self.messenger.doWarning("Error: no experiment selected!")
+            return
+        
+        d = []
+        for _d in self.ut.trimString(self.m['d']).split(self.delimiter):
+            d.append(int(_d))
+        z = []
+        for _z in self.ut.trimString(self.m['z']).split(self.delimiter):
+            z.append(int(_z))
+            
+        basedir = self.experimentDir + '/' + self.m['name']
+        aggregate = ExperimentAggregate(self.ut, d, z)
+        a = aggregate.compute([basedir + '/' + eName for eName in eList])
+        if a is None:
+            self.messenger.doWarning("Error: the experiments could not be loaded!")
+            return
+        self.messenger.logConsole("{} experiment(s) aggregated over {} time steps".format(len(a['runs']), a['time'].shape[0]))
+        
+        params = {}
+        params['m'] = self.m
+        params['a'] = a
+        params['confidence'] = aggregate.confidence
+        params['layer'] = self.c_t1_f1_f1_L.get()
+        params["layerdetails"] = self.context['layerdetails']
+        
+        AggregatePlot(params)
+
+    def doPCA(self):
+        
+        # the states of every experiment listed with the current filter, 
+        # projected on the principal components fitted over all of them
+        eList = list(self.c_t1_f1_f1_E["values"])
+        if self.m is None or len(eList) == 0:
+            self.messenger.doWarning("Error: no experiment selected!")
+            return
+        
+        basedir = self.experimentDir + '/' + self.m['name']
+        try:
+            X, sizes = self.ut.pcaFromDatabase([], [basedir + '/' + eName for eName in eList])
+        except (IOError, ValueError) as err:
+            self.messenger.doWarning("Error: the experiments could not be loaded ({})".format(err))
+            return
+        self.messenger.logConsole("{} experiment(s) projected, {} time steps".format(len(X), sum([s[0] for s in sizes])))
+        
+        params = {}
+        params['m'] = self.m
+        params['X'] = X
+        params['names'] = eList
+        
+        LatentPlot(params)
+
     def doExport(self):
 
         basedir = self.experimentDir + '/' + self.m['name'] + '/' + self.c_t1_f1_f1_E.get()                 
@@ -365,6 +403,11 @@ class Analysis():
         basedir = self.experimentDir + '/' + self.m['name'] + '/' + eName
         if self.messenger.doYesNo("This operation cannot be undone. Do you want to proceed?'"):
             if self.ut.removeDir(basedir):                    
+                try:
+                    self.getCatalog().remove(self.m['name'], eName)
+                except sqlite3.Error as err:
+                    # the folder is gone, the next listing drops its row
+                    self.messenger.doWarning("Warning: the experiment could not be removed from the catalog ({})".format(err))
                 #self.messenger.doInfo("The experiment was successfully removed!'")
                 self.messenger.logConsole("The experiment was successfully removed!'")
                 self.updateControls()
@@ -82,6 +82,7 @@ class Dataset():
         self.yLimMouse = [-55.0, 55.0]
         
         self.d = None
+        self.store = None
         self.m = None
         
         self.numberTimes = 0
@@ -327,6 +328,7 @@ class Dataset():
                 if(self.ut.saveDataset(self.datasetDir, d)):
                     self.messenger.doInfo("The dataset was added successfully!")
                     self.d = d
+                    self.store = self.ut.getDatasetStore(self.datasetDir, self.d)
                     self.updateDatasetControls(text=nDataset)
                     self.clearPrimitives()
                 else:
@@ -379,6 +381,7 @@ class Dataset():
         dName = self.c_t1_f2_M.get()        
         if len(dName) > 0 :
             self.d = self.ut.parseDataset(self.datasetDir + '/' + dName)
+            self.store = self.ut.getDatasetStore(self.datasetDir, self.d)
             self.updateDatasetControls(text=dName)           
             self.clearPrimitives() 
             for p in self.d['data']:
@@ -392,6 +395,10 @@ class Dataset():
         
         if not self.d is None:
             dName = self.d['name']       
+            # the network library reads the primitive files by contiguous number
+            if not self.store.compact():
+                self.messenger.doWarning("Error, the dataset could not be renumbered!")
+                return
             self.updateObserver()        
             self.messenger.doInfo('The datset \'{}\' has been selected!'.format(dName))                         
         
@@ -412,6 +419,7 @@ class Dataset():
             else:
                 self.messenger.doWarning('The dataset \'{}\' could not be removed!'.format(nDataset))            
         self.d = None    
+        self.store = None
         self.updateObserver()
 
     # === Primitive edition methods ---------
@@ -424,10 +432,12 @@ class Dataset():
         
         pLen = len(self.drawBuffer)                
         if pLen  ==  self.numberTimes:                                                            
-            self.allocatePrimitive(np.vstack(self.drawBuffer))
+            X = np.vstack(self.drawBuffer)
+            self.allocatePrimitive(X)
             self.updatePrimitiveControls()        
-        if not self.ut.saveDataset(self.datasetDir, self.d):
-            self.messenger.doWarning("Error, the dataset could not be updated!")
+            # only the new primitive file is written
+            if not self.store.append(X):
+                self.messenger.doWarning("Error, the dataset could not be updated!")
         self.addPrimitiveMode = False        
         self.updateAddPrimitiveControl()                
                 
@@ -517,9 +527,10 @@ class Dataset():
                 
     def doRemovePrimitive(self):
         
-        self.deallocatePrimitive(self.c_t1_f3_M.current()+1)
+        i = self.c_t1_f3_M.current()
+        self.deallocatePrimitive(i+1)
         self.updatePrimitiveControls()        
-        if not self.ut.saveDataset(self.datasetDir, self.d):
+        if not self.store.remove(i):
              self.messenger.doWarning("Error, the dataset could not be updated!")
                 
     # === Observer design pattern methods
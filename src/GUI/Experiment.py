@@ -63,11 +63,13 @@ from matplotlib.backend_bases import key_press_handler
 from matplotlib.figure import Figure
 import matplotlib.gridspec as gridspec
 
-from network.PVRNN import PVRNN
+from tools.session import ExperimentSession, Trail
+from tools.control import RingBuffer, ControlLoop, Scheduler
+from tools.recorder import ExperimentRecorder
 
-import ctypes
 from GUI.Message import Message
 from GUI.Mouse import Mouse
+from GUI.Blitter import Blitter
 
 
 class Experiment():
@@ -78,6 +80,7 @@ class Experiment():
         self.master = _master                
         self.context = _context
         self.nrl = self.context['nrl']
+        self.modelCache = self.context['modelcache']
         self.ut = self.context['ut']        
         self.cwp = self.context['cwd']        
         self.delimiter = self.context['delimiter']
@@ -107,7 +110,8 @@ class Experiment():
         self.datasetColor = '#4affff'
         self.drawColor = 'brown'
 
-        self.time_ms = self.ut.getCurrentTimeMS()        
+        self.framePeriod = 40
+        self.ringSize = 256
         
         #--- Initialization         
         self.mouseIn = False
@@ -126,28 +130,30 @@ class Experiment():
         self.alpha = 0.3
         self.beta1 = 0.1
         self.beta2 = 0.95
-        self.nBuffdata = self.windowSize * self.nActDof
         self.expTimeSteps = 2000
         self.runExperiment = False                        
         self.plotBuffSize = 50 # for visualization purposes
         self.topDownId = 0
-        self.ERStartTime = self.windowSize -1
         
         # maps 
         self.primSet = {}   
         self.state_index = {}
         
         # containers
-        self.robotBuffer = deque(maxlen=self.plotBuffSize)    
-        self.humanBuffer = deque(maxlen=self.plotBuffSize)    
-        self.posWinBuffer = deque(maxlen=self.windowSize)    
-        self.signal_list = []
-        self.opt_elbo_list = []
-        self.state_list = []
-        self.tgt_pos_list = []
-        self.cur_pos_list = []        
-        self.hum_pos_list = []        
-        self.hum_int_list = []        
+        self.session = ExperimentSession(self.nrl, self.motionSaturation, self.modelCache)
+        self.robotTrail = Trail(self.plotBuffSize, self.nActDof)
+        self.humanTrail = Trail(self.plotBuffSize, self.nActDof)
+        self.control = None
+        self.scheduler = None
+        self.ring = None
+        self.ringTail = 0
+        self.cursorHand = False
+        self.signalRescale = False
+        self.signalBuffer = np.zeros((self.expTimeSteps,), dtype=np.float32)
+        self.signalTimes = np.zeros((self.expTimeSteps,), dtype=np.float32)
+        self.signalStart = 0
+        self.recorder = ExperimentRecorder()
+        self.streamDateTime = ''
         self.primCanvas = []  
 
         self.signalVar =  tk.BooleanVar() 
@@ -332,12 +338,10 @@ class Experiment():
         self.humanCanvas, = self.ax.plot(0.0, 0.0)
         self.signalCanvas, = self.axSignal.plot(0.0, 0.0, color='orangered')
         self.signalTitle = self.ax.text(-55.0, -63.0, '', style='italic', color=self.datasetColor)                
-
-        self.cur_pos = np.array([0.0,0.0])        
-        self.hum_pos = np.array([0.0,0.0])        
+        self.blitter = Blitter(self.f_t1_f2_canvas, [self.robotCanvas, self.robotEffCanvas, self.humanCanvas, self.signalCanvas, self.drawControl, self.drawWSTitle, self.signalTitle])
         
-        # thread loop 
-        self.timer = self.fig.canvas.new_timer(interval=10, callbacks=[(self.doLoop, [], {})])        
+        # GUI loop, the model itself is stepped by the control thread 
+        self.timer = self.fig.canvas.new_timer(interval=self.framePeriod, callbacks=[(self.doLoop, [], {})])        
         self.timer.start()
 
     def doScaleMotorCompliance(self,val):
@@ -348,8 +352,13 @@ class Experiment():
     def doComboSignal(self, event):
         
         opt = self.c_t1_f1_f1_S.get()
-        self.signal_list = []
+        self.signalStart = self.step
         self.signalTitle.set_text('Signal: {}'.format(opt))
+        # the range of the previous signal does not apply, the axes are 
+        # part of the cached background and are redrawn
+        self.resetSignalLimits()
+        self.signalRescale = False
+        self.blitter.invalidate()
         self.f_t1_f2_canvas.get_tk_widget().focus_set()
 
     def doComboFormatSignal(self, event):
@@ -357,15 +366,15 @@ class Experiment():
         self.f_t1_f2_canvas.get_tk_widget().focus_set()
         
     
-    def processSignal(self):        
+    def processSignal(self, _i, _elbo, _state):        
         
         idx = self.c_t1_f1_f1_S.current()
         format_idx = self.c_t1_f1_f1_F.current()
         d = 0.0
         if idx < 3:
-            d = self.opt_elbo_list[-1][idx]
+            d = _elbo[idx]
         else:
-            s = self.nrl.e_getStateMap(self.state_list[-1])
+            s = self.nrl.e_getStateMap(_state)
             k = self.nrl.e_getStateKey(idx - 3)            
             d_raw = s[k]
             if format_idx == 0:
@@ -374,7 +383,9 @@ class Experiment():
                 d = np.sum(np.array(d_raw))
             else:
                 d = np.mean(np.array(d_raw))
-        self.signal_list.append(d)
+        self.signalBuffer[_i] = d
+        if self.updateSignalLimits(d):
+            self.signalRescale = True
         
     
     def doComboPostdiction(self, event):
@@ -406,6 +417,9 @@ class Experiment():
             self.robotCanvas.axes.figure.canvas.draw()             
             self.f_t1_f2_canvas.get_tk_widget().focus_set()
             self.doComboSignal(None)
+            if len(self.recorder) == 0 and not self.recorder.isStreaming():
+                self.startStream()
+            self.startControl()
             self.updateObserver()
         
     def doPause(self):
@@ -415,6 +429,7 @@ class Experiment():
             self.b_t1_f1_f4_f2_Pause.configure(state= tk.DISABLED)        
             self.b_t1_f1_f4_f2_Reset.configure(state= tk.NORMAL)
             self.b_t1_f1_f4_f2_Save.configure(state= tk.NORMAL)
+            self.stopControl()
             self.runExperiment = False               
             self.drawControl.set_text('')  
             self.robotCanvas.axes.figure.canvas.draw()     
@@ -430,33 +445,63 @@ class Experiment():
             self.signalTitle.set_text('')  
             self.robotCanvas.axes.figure.canvas.draw()     
         
+    def experimentInfo(self):
+        
+        _e = {}
+        _e['model'] = self.m['name']
+        _e['dataset'] = self.d['name']
+        _e['numbertimes'] = '{}'.format(len(self.recorder))
+        _e['samplingperiod'] = '{}'.format(self.d['samplingperiod'])
+        _e['primitiveid'] = self.c_t1_f1_f4_Prim.get()
+        _e['windowSize'] = self.e_t1_f1_f3_Win.get()
+        _e['w'] = self.e_t1_f1_f3_W.get()
+        _e['postdiction'] = '{}'.format(self.e_enabled)
+        _e['epochs'] = self.e_t1_f1_f3_E.get()
+        _e['alpha'] = self.e_t1_f1_f2_ADAM_A.get()
+        _e['beta1'] = self.e_t1_f1_f2_ADAM_B1.get()
+        _e['beta2'] = self.e_t1_f1_f2_ADAM_B2.get()
+        _e['motorcompliance'] = '{}'.format(self.mc)
+        return _e
+    
+    def startStream(self):
+        
+        # the folder is created when the experiment starts and the rows are 
+        # appended during the run, an interrupted run can still be analysed
+        _e = self.experimentInfo()
+        _e['layout'] = self.recorder.getLayout()
+        exDir = self.ut.beginExperiment(self.experimentDir+'/'+self.m['name'], _e)
+        if exDir is None:
+            print("Warning: the experiment could not be streamed to disk, it is kept in memory")
+            self.recorder.allocate(self.expTimeSteps, self.stateBufferSize, self.nActDof)
+            return
+        self.recorder.open(exDir)
+        self.streamDateTime = _e['datetime']
+        
+    def discardStream(self):
+        
+        # a streamed experiment reset without being saved is removed
+        if self.recorder.isStreaming():
+            exDir = self.recorder.exDir
+            self.recorder.close()
+            self.ut.removeDir(exDir)
+        
     def doSave(self, loop=False):
         
         if not self.m is None:
             print ("Saving experiment")
-            _e = {}
-            _e['model'] = self.m['name']
-            _e['dataset'] = self.d['name']
-            _e['numbertimes'] = '{}'.format(self.step)
-            _e['samplingperiod'] = '{}'.format(self.d['samplingperiod'])
-            _e['primitiveid'] = self.c_t1_f1_f4_Prim.get()
-            _e['windowSize'] = self.e_t1_f1_f3_Win.get()
-            _e['w'] = self.e_t1_f1_f3_W.get()
-            _e['postdiction'] = '{}'.format(self.e_enabled)
-            _e['epochs'] = self.e_t1_f1_f3_E.get()
-            _e['alpha'] = self.e_t1_f1_f2_ADAM_A.get()
-            _e['beta1'] = self.e_t1_f1_f2_ADAM_B1.get()
-            _e['beta2'] = self.e_t1_f1_f2_ADAM_B2.get()
-            _e['motorcompliance'] = '{}'.format(self.mc)
-            _e['cur_pos'] = np.vstack(self.cur_pos_list)        
-            _e['tgt_pos'] = np.vstack(self.tgt_pos_list)
-            _e['hum_pos'] = np.vstack(self.hum_pos_list)
-            _e['hum_int'] = np.vstack(self.hum_int_list)
-            _e['states'] = np.vstack(self.state_list)
-            _e['elbo'] = np.vstack(self.opt_elbo_list)        
+            _e = self.experimentInfo()
+            _e.update(self.scheduler.getSummary())
             
+            if self.recorder.isStreaming():
+                exDir = self.recorder.exDir
+                _e['datetime'] = self.streamDateTime
+                _e['layout'] = self.recorder.getLayout()
+                saved = self.recorder.close() and self.ut.endExperiment(exDir, _e)
+            else:
+                _e.update(self.recorder.getColumns())
+                saved = self.ut.saveExperiment(self.experimentDir+'/'+self.m['name'], _e)
             
-            if self.ut.saveExperiment(self.experimentDir+'/'+self.m['name'], _e):
+            if saved:
                 if loop:
                     self.messenger.doInfo("The experiment has finished, data has been saved succesfully!")
                 else:
@@ -473,99 +518,86 @@ class Experiment():
             self.updateObserver()
             
     
+    def startControl(self):
+        
+        self.stopControl()
+        self.control = ControlLoop(self.session, self.recorder, self.ring, self.readHumanInput, self.scheduler, self.expTimeSteps)
+        self.control.start()
+        
+    def stopControl(self):
+        
+        if not self.control is None:
+            self.control.stop()
+        self.control = None
+        
+    def readHumanInput(self):
+        
+        # called from the control thread, only plain attributes are read here
+        hXY, mouseIn = self.mouseH.getXY()            
+        if not mouseIn:      
+            hXY = self.session.hum_pos
+        return hXY, self.interationMode, self.mc
+    
+    def consumeSample(self, _n):
+        
+        # overrun samples are skipped, the recorder of the control thread keeps them
+        sample = self.ring.fetch(_n)
+        if sample is None:
+            return
+        step = int(sample['step'])
+        self.robotTrail.append(sample['cur_pos'])
+        if sample['interaction']:
+            self.humanTrail.append(sample['hum_pos'])
+        self.processSignal(step - 1, sample['elbo'], sample['state'])
+        self.step = step
+    
     def doLoop(self):
         
-        ms_ = self.ut.getCurrentTimeMS()
-        tDiff = ms_ - self.time_ms 
-                
-        if self.step == self.expTimeSteps and self.runExperiment:
+        if self.control is None:
+            return
+        
+        # consume everything the control thread published since the last frame
+        tail, head = self.ring.read(self.ringTail)
+        if head > tail:
+            self.signalRescale = False
+            for n in range(tail, head):
+                self.consumeSample(n)
+            self.ringTail = head
+            t = time.perf_counter_ns()
+            self.render()
+            self.scheduler.recordRender(time.perf_counter_ns() - t)
+            
+        if self.control.finished and self.runExperiment:
+            self.stopControl()
             self.runExperiment = False
             self.doSave(True)
             
-        if (tDiff > self.samplingPeriod and self.runExperiment):
-            tgt_pos = np.array([0.0,0.0])        
-            tgt_pos_buffer = np.zeros((self.nActDof,), dtype=float);
-            dataOut = (ctypes.c_float * self.nActDof)(*tgt_pos_buffer)
-            
-            # generate the robot intention        
-            self.nrl.e_generate(dataOut)                                        
-            tgt_pos = np.frombuffer(dataOut, np.float32)
-            new_cur_pos = tgt_pos                
-                        
-            # capture the human intention                     
-            hXY, mouseIn = self.mouseH.getXY()            
-            if self.interationMode:
-                if not mouseIn:      
-                    hXY = self.hum_pos
-                self.master.configure(cursor="hand1")    
-                self.humanBuffer.append(hXY)                        
-                
-                # merge robot and human intention
-                new_cur_pos = self.mc*hXY + (1.0 - self.mc)*tgt_pos
-                self.hum_pos = hXY
-            else:
-                self.master.configure(cursor="")    
-
-            delta = new_cur_pos - self.cur_pos             
-            xDeltaSat = min(self.motionSaturation, max(delta[0], -self.motionSaturation))
-            yDeltaSat = min(self.motionSaturation, max(delta[1], -self.motionSaturation))                    
-            self.cur_pos = self.cur_pos + np.array([xDeltaSat, yDeltaSat])
-    
-            self.posWinBuffer.append(self.cur_pos)
-            opt_elbo = [0.0,0.0,0.0]
-            if self.e_enabled:                                             
-                if (self.step >= self.ERStartTime): 
-                    
-                    elbo_buffer = np.zeros((3,), dtype=float);
-                    elboOut = (ctypes.c_float * 3)(*elbo_buffer)        
-                    pos_win_1d = np.hstack(self.posWinBuffer)                
-                    self.nrl.e_postdict((ctypes.c_float * self.nBuffdata)(*pos_win_1d), elboOut, self.showERLog)
-                    opt_elbo = np.frombuffer(elboOut, np.float32).tolist()                    
-    
-            m_state = np.zeros((self.stateBufferSize,), dtype=float);
-            m_stateOut = (ctypes.c_float * self.stateBufferSize)(*m_state)
-            self.nrl.e_getState(m_stateOut)
-            st_data = np.frombuffer(m_stateOut, np.float32)
-                        
-            # appending data to experiment containers    
-            self.state_list.append(st_data)
+    def render(self):
+        
+        if not self.cursorHand == self.interationMode:
+            self.cursorHand = self.interationMode
+            self.master.configure(cursor="hand1" if self.cursorHand else "")    
             
-            self.opt_elbo_list.append(opt_elbo)
-            self.tgt_pos_list.append(tgt_pos)
-            self.cur_pos_list.append(self.cur_pos)
-            self.hum_pos_list.append(self.hum_pos)
-            self.hum_int_list.append(self.interationMode)
-                                    
-            # get the most recent measurement       
-            if len(self.humanBuffer) > 0 and self.drawHuman :
-                vData = np.vstack(self.humanBuffer)
-                self.humanCanvas.set_data(vData[:,0], vData[:,1])
-                    
-            #draw primitives
-            for k in self.primSet.keys():
-                p = self.primSet[k]
-                vData = p['d']
-                c = p['c']
-                c.set_data(vData[:,0], vData[:,1])                         
-                                        
-            self.robotBuffer.append(self.cur_pos)            
-            vData = np.vstack(self.robotBuffer)
-            self.robotCanvas.set_data(vData[:,0], vData[:,1])                
-            self.robotEffCanvas.set_data(vData[-1,0], vData[-1,1])                
-            self.drawControl.set_text(self.tCtrMsg)    
-            self.robotCanvas.axes.figure.canvas.draw()            
+        # get the most recent measurement       
+        if len(self.humanTrail) > 0 and self.drawHuman :
+            vData = self.humanTrail.view()
+            self.humanCanvas.set_data(vData[:,0], vData[:,1])
                 
-            self.processSignal()
-            vData2 = np.vstack(self.signal_list)
-            eT = np.linspace(0.0, (self.step*self.samplingPeriod)/1000.0, num=len(self.signal_list))              
+        vData = self.robotTrail.view()
+        self.robotCanvas.set_data(vData[:,0], vData[:,1])                
+        self.robotEffCanvas.set_data(vData[-1:,0], vData[-1:,1])                
+        self.drawControl.set_text(self.tCtrMsg)    
             
-            self.signalCanvas.set_data(eT, vData2)
-            self.signalCanvas.axes.autoscale_view(tight=True)            
-            self.signalCanvas.axes.relim()            
-            self.signalCanvas.axes.figure.canvas.draw()                        
-                    
-            self.time_ms = ms_
-            self.step = self.step + 1 
+        i0 = min(self.signalStart, self.step)
+        i1 = self.step
+        self.signalCanvas.set_data(self.signalTimes[i0:i1], self.signalBuffer[i0:i1])
+        
+        # the primitives and the axes are part of the cached background, 
+        # only the animated artists are blitted unless the signal leaves its range
+        if self.signalRescale:
+            self.blitter.invalidate()
+        else:
+            self.blitter.update()
             
 
     def keyPressed(self, event):    
@@ -581,10 +613,30 @@ class Experiment():
             self.tCtrMsg = 'Press control to interact'
             self.interationMode = False                        
 
+    def updateSignalLimits(self, _v):
+        
+        if self.signalYmin <= _v <= self.signalYmax:
+            return False
+        margin = 0.1*max(abs(_v), 1.0)
+        self.signalYmin = min(self.signalYmin, _v - margin)
+        self.signalYmax = max(self.signalYmax, _v + margin)
+        self.axSignal.set_ylim(self.signalYmin, self.signalYmax)
+        return True
+        
+    def resetSignalLimits(self):
+        
+        tMax = 1.0
+        if self.expTimeSteps > 1:
+            tMax = float(self.signalTimes[-1])
+        self.signalYmin = 0.0
+        self.signalYmax = 0.0
+        self.axSignal.set_xlim(0.0, tMax)
+        self.axSignal.set_ylim(-1.0e-3, 1.0e-3)
+        
     def allocatePrimitive(self, _d):        
         
         i = len(self.primSet.keys()) + 1
-        c, = self.ax.plot(1000,1000, color=self.datasetColor, alpha=0.1)            
+        c, = self.ax.plot(_d[:,0], _d[:,1], color=self.datasetColor, alpha=0.1)            
         self.primSet[i] = {'c':c, 'd':_d}            
             
     def clearPrimitives(self):   
@@ -619,7 +671,6 @@ class Experiment():
             
     def experimentReset(self):
         
-        self.runExperiment  = False 
         mName = self.m['name']
         
         proceed = True        
@@ -637,9 +688,6 @@ class Experiment():
             proceed = False            
         try:
             self.windowSize = self.ut.parseString(self.e_t1_f1_f3_Win.get(), 'int', self.delimiter)[0]
-            self.nBuffdata = self.windowSize * self.nActDof
-            self.ERStartTime = self.windowSize -1 
-            self.posWinBuffer = deque(maxlen=self.windowSize)              
         except: 
             error_msg = error_msg + 'The field \'window\' should be set to an integer value\n'
             proceed = False                
@@ -676,43 +724,51 @@ class Experiment():
             
         modelConfigPath = self.cwp + '/' + self.ut.modelPathString(self.modelConfigDir, mName)                
 
+        # the fields are valid, a running experiment is only stopped now, so 
+        # that a rejected reset leaves it running and finalized as usual
+        self.stopControl()
+        self.runExperiment  = False 
         self.step = 0
-        self.humanBuffer.clear()
-        self.robotBuffer.clear()
-        self.opt_elbo_list = []
-        self.state_list = []
-        self.signal_list  = []
-        self.cur_pos_list  = []
-        self.tgt_pos_list  = []
-        self.hum_pos_list  = []
-        self.hum_int_list  = []
-        self.cur_pos = np.array([0.0,0.0]) 
-        self.robotCanvas.set_data(0.0, 0.0)                
-        self.robotEffCanvas.set_data(0.0, 0.0)                
-        self.robotCanvas.axes.figure.canvas.draw()            
-        self.signalCanvas.set_data(0.0,0.0)
-        self.signalCanvas.axes.autoscale_view(tight=True)            
-        self.signalCanvas.axes.relim()            
-        self.signalCanvas.axes.figure.canvas.draw()                                        
-        
-        self.nrl.newModel(modelConfigPath.encode('ascii')) 
-        self.nrl.load()
-        #self.stateBufferSize = self.nrl.getStateBufferSize(self.ut.trimString(self.m['d']), self.ut.trimString(self.m['z']), self.delimiter)
-  
-        self.stateParser = PVRNN(self.ut.trimString(self.m['d']), self.ut.trimString(self.m['z']), self.ut.trimString(self.m['t']), self.delimiter)
-        self.nrl.setStateParser(self.stateParser)
-        self.stateBufferSize = self.nrl.getStateBufferSize()
+        self.signalStart = 0
+        self.robotTrail.clear()
+        self.humanTrail.clear()
+        self.signalBuffer = np.zeros((self.expTimeSteps,), dtype=np.float32)
+        self.signalTimes = np.arange(self.expTimeSteps, dtype=np.float32)*(self.samplingPeriod/1000.0)
+        self.robotCanvas.set_data([], [])                
+        self.robotEffCanvas.set_data([], [])                
+        self.signalCanvas.set_data([], [])
+        self.resetSignalLimits()
+        
+        # the model is reloaded only if its files changed since the last reset
+        # or if the last run adapted it by postdiction
+        self.stateParser = self.modelCache.load(modelConfigPath, self.m['modelpath'], self.ut.trimString(self.m['d']), self.ut.trimString(self.m['z']), self.ut.trimString(self.m['t']), self.delimiter)
+        self.session.reset(self.windowSize, self.e_enabled, self.showERLog)
+        self.stateBufferSize = self.session.stateBufferSize
+        self.nActDof = self.session.nDof
+        self.discardStream()
+        self.recorder.allocate(self.expTimeSteps, self.stateBufferSize, self.nActDof, False)
+        self.ring = RingBuffer(self.ringSize, {'step': ((), np.int64),
+                                               'cur_pos': ((self.nActDof,), np.float32),
+                                               'hum_pos': ((self.nActDof,), np.float32),
+                                               'elbo': ((3,), np.float32),
+                                               'state': ((self.stateBufferSize,), np.float32),
+                                               'interaction': ((), bool)})
+        self.ringTail = 0
+        self.scheduler = Scheduler(self.samplingPeriod, self.expTimeSteps)
+        if not self.robotTrail.buffer.shape[1] == self.nActDof:
+            self.robotTrail = Trail(self.plotBuffSize, self.nActDof)
+            self.humanTrail = Trail(self.plotBuffSize, self.nActDof)
         
         storeStates = False
         storeER = False
         self.nrl.e_enable(self.topDownId,\
                             self.windowSize,
-                            (ctypes.c_float * len(self.w))(*self.w),
+                            np.array(self.w, dtype=np.float32),
                             self.expTimeSteps, 
                             self.postdiction_epochs,
-                            (ctypes.c_float)(self.alpha),
-                            (ctypes.c_float)(self.beta1),
-                            (ctypes.c_float)(self.beta2), storeStates, storeER)
+                            self.alpha,
+                            self.beta1,
+                            self.beta2, storeStates, storeER)
         
         sList = ['N-ELBO','Reconstruction', 'Regulation']
         for l in range(self.m['nlayers']):
@@ -735,6 +791,7 @@ class Experiment():
         self.clearPrimitives()
         for p in self.d['data']:
             self.allocatePrimitive(p)
+        self.blitter.invalidate()
         self.initComboPrimitive(True)
         self.b_t1_f1_f4_f2_Start.configure(state= tk.NORMAL)
         self.b_t1_f1_f4_f2_Pause.configure(state= tk.DISABLED)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+import numpy as np
+import matplotlib.pyplot as plt
+
+class LatentPlot():
+    
+    def __init__(self, _params):
+        
+        m = _params['m']
+        X = _params['X']
+        names = _params['names']
+        
+        wW = 8                
+        wH = 8
+        
+        fig, ax = plt.subplots(constrained_layout=False, figsize=(wW, wH))                           
+        fig.canvas.set_window_title('Agent {} - State space of {} experiments'.format(m['name'], len(X)))
+        
+        plt.rc('font', size=7)
+        font = {'family': 'serif',
+                'color':  'darkred',
+                'weight': 'bold',
+                'size': 8,
+                }        
+        ax.set_title('Principal components of the standardized states', fontdict=font)
+        
+        # one trajectory per experiment, its first step marked
+        for P, name in zip(X, names):
+            line, = ax.plot(P[:,0], P[:,1], linewidth=0.8, label=name)
+            ax.plot(P[:1,0], P[:1,1], 'o', color=line.get_color())
+            
+        ax.set_xlabel('PC1')
+        ax.set_ylabel('PC2')
+        if len(X) <= 10:
+            ax.legend()
+        plt.show()
@@ -294,7 +294,7 @@ class Modeling():
         if not m is None:
             mPath = m['modelpath']                
             if len(mPath) > 0:
-                prevTrain = self.ut.parseTrainingData(mPath)
+                prevTrain = self.ut.getTrainingHistory(mPath)
             
         return prevTrain   
     
@@ -361,7 +361,8 @@ class Modeling():
         if t is None:
             self.messenger.doInfo('The model \'{}\' has no previous training !'.format(mName))                        
         else:                
-            TrainingPlot(mName, t, self.context)            
+            m = self.m
+            TrainingPlot(mName, t, self.context, lambda: self.getTrainingData(m))            
         
     def doSelect(self):        
         
@@ -56,8 +56,9 @@ from tkinter import ttk
 from GUI.Message import Message
 from IPython.utils.capture import capture_output
 from GUI.TrainingPlot import TrainingPlot
+from tools.metricslog import MetricsLog
+from tools.traininglog import TrainingLog
 import numpy as np
-import ctypes
 
 
 class ConsoleRedirect(object):
@@ -231,10 +232,13 @@ class Training():
     def doDetailModel(self):
         
         mName = self.m['name']        
-        if self.prevTrain is None:
+        mPath = self.m['modelpath']
+        train = self.ut.getTrainingHistory(mPath)
+        if train is None:
             self.messenger.doInfo('The model \'{}\' has no previous training !'.format(mName))            
         else:                
-            TrainingPlot(mName, self.prevTrain,self.context)
+            # live while the model trains
+            TrainingPlot(mName, train, self.context, lambda: self.ut.getTrainingHistory(mPath))
     
     def updateControls(self):        
         
@@ -244,7 +248,7 @@ class Training():
             if self.prevTrain is None:
                 mPath = self.m['modelpath']                
                 if len(mPath) > 0:
-                    self.prevTrain = self.ut.parseTrainingData(mPath)
+                    self.prevTrain = self.ut.getTrainingHistory(mPath)
 
         state_ = tk.NORMAL
         stStop_ = tk.DISABLED        
@@ -255,8 +259,11 @@ class Training():
             stStop_ = tk.NORMAL
             stTrain_ = tk.DISABLED            
             state_ =  tk.DISABLED            
+        elif not self.nrl.canTrain:
+            # the NumPy engine only generates
+            stTrain_ = tk.DISABLED            
             
-        if self.prevTrain is None:            
+        if self.prevTrain is None and not self.isTraining:            
             stDetais_ = tk.DISABLED                                                       
 
         for widget in self.inputWidgets:
@@ -309,6 +316,11 @@ class Training():
                 return False
             self.epochs = epochs[0] - mEpochs   
                       
+        # the network library reads the primitive files by contiguous number
+        if not self.ut.getDatasetStore(self.datasetDir, self.d).compact():
+            self.messenger.doWarning("Error, the dataset could not be renumbered!")
+            return False
+            
         absDatasetDir = self.cwp + os.sep + self.datasetDir.replace('/',os.sep) + os.sep + self.d['name']        
         
         self.m['datapath'] = absDatasetDir
@@ -357,8 +369,7 @@ class Training():
             sys.stdout = self.redirect                 
             print("\nTraining started!\n")
             self.nrl.t_init(False)
-            train_buffer = np.zeros((7,), dtype=float);
-            trainOut = (ctypes.c_float * 7)(*train_buffer)
+            trainOut = np.zeros((7,), dtype=np.float32)
             e_sum = 0
             epochs_ = self.epochs
             nTimes = int(epochs_ / self.refreshFactor)
@@ -382,6 +393,18 @@ class Training():
             message = message + '---------------------------------------------------------------------------------------------------------'
             print(message)            
             
+            # every t_loop result is also appended to the binary metrics of the
+            # model, a new training restarts them, a retraining of a model 
+            # without them starts from its text log
+            metrics = MetricsLog(self.m['modelpath'])
+            retrain = self.m['retrain'] == 'true'
+            history = None
+            logName = self.m['modelpath'] + '/' + self.ut.trainingFileName
+            if retrain and MetricsLog.read(self.m['modelpath']) is None and self.ut.fileExists(logName):
+                # a private reader, the one of Utils serves the Tk thread
+                history = TrainingLog(logName).read()
+            metrics.open(retrain, history)
+            
             trained = False
             for e in range(nTimes):                
                 if self.stop == True:
@@ -391,8 +414,9 @@ class Training():
                 if e == nTimes - 1:
                     nIt = min(nIt, epochs_-e_sum)                    
                 self.nrl.t_loop(trainOut, nIt)
+                metrics.append(trainOut)
                 e_sum = e_sum + self.refreshFactor
-                tl = np.frombuffer(trainOut, np.float32).tolist()                                
+                tl = trainOut.tolist()                                
                 saved = 'No'
                 if bool(int(tl[6]))> 0:
                     saved = 'Yes'
@@ -408,17 +432,23 @@ class Training():
                 self.m['dsname'] = self.d['name']
                 self.m['train'] = trained
                 
+            metrics.close()
             self.nrl.t_end()
             self.enableTraining(False)
             print("\nTraining end!")            
             sys.stdout = sys.__stdout__
             
+        if not self.nrl.canTrain:
+            self.messenger.doWarning("The training requires the NRL library, which could not be loaded!")
+            return
+            
         #Updating the model training parameters        
         if not self.validateForm():
             return        
             
         if self.epochs > 0:
             self.enableTraining(True)       
+            self.context['modelcache'].invalidate()
             self.nrl.newModel(self.modelConfigPath.encode('ascii'))                
     
             ## Commence la Boucle de Tkinter, pour lire le stdout
@@ -449,7 +479,7 @@ class Training():
             
             if self.m['train']:                    
                 mPath= self.m['modelpath']          
-                self.prevTrain = self.ut.parseTrainingData(mPath)
+                self.prevTrain = self.ut.getTrainingHistory(mPath)
             
             dsName = ''                                                
             if not self.d is None:                                        
@@ -53,7 +53,7 @@ import matplotlib.pyplot as plt
 
 class TrainingPlot():
     
-    def __init__(self, _mName, _train, _context):
+    def __init__(self, _mName, _train, _context, _refresh=None, _interval=1000):
         
         wW = 8                
         wH = 5
@@ -83,11 +83,42 @@ class TrainingPlot():
                 'size': 12,
                 }
         axes[0][0].set_title('Posterior reconstruction error', y=titleY, fontdict=font)
-        axes[0][0].plot(times, _train[:,2])
+        l0, = axes[0][0].plot(times, _train[:,2])
         axes[0][1].set_title('Prior reconstruction error', y=titleY, fontdict=font)
-        axes[0][1].plot(times, _train[:,3], color='brown')
+        l1, = axes[0][1].plot(times, _train[:,3], color='brown')
         axes[1][0].set_title('Regulation error', y=titleY, fontdict=font)
-        axes[1][0].plot(times, _train[:,4], color='darkgreen')
+        l2, = axes[1][0].plot(times, _train[:,4], color='darkgreen')
         axes[1][1].set_title('Loss (Negative ELBO)', y=titleY, fontdict=font)
-        axes[1][1].plot(times, _train[:,5], color='darkmagenta')
-        plt.show()
\ No newline at end of file
+        l3, = axes[1][1].plot(times, _train[:,5], color='darkmagenta')
+        
+        # the curves follow the log while the window is open, _refresh returns 
+        # the rows read so far and only parses the appended lines
+        self.fig = fig
+        self.axes = [axes[0][0], axes[0][1], axes[1][0], axes[1][1]]
+        self.lines = [l0, l1, l2, l3]
+        self.refresh = _refresh
+        self.n = _train.shape[0]
+        self.timer = None
+        if not _refresh is None:
+            self.timer = fig.canvas.new_timer(interval=_interval)
+            self.timer.add_callback(self.doRefresh)
+            self.timer.start()
+            fig.canvas.mpl_connect('close_event', self.doClose)
+        plt.show()
+        
+    def doRefresh(self):
+        
+        train = self.refresh()
+        if train is None or train.shape[0] == self.n:
+            return
+        self.n = train.shape[0]
+        times = np.arange(self.n) * train[0,0]
+        for i in range(4):
+            self.lines[i].set_data(times, train[:,2+i])
+            self.axes[i].relim()
+            self.axes[i].autoscale_view()
+        self.fig.canvas.draw_idle()
+        
+    def doClose(self, _event):
+        
+        self.timer.stop()
\ No newline at end of file
@@ -57,6 +57,7 @@ class NRL(object):
     
     def __init__(self):
         
+        self.canTrain = True
         libFolder = 'lib'
         libName = 'libNRL'
         if _platform == "linux" or _platform == "linux2": # linux
@@ -69,10 +70,50 @@ class NRL(object):
             libName = libName + '.dll'            
 
         self.lib = cdll.LoadLibrary(os.path.dirname(__file__) + os.sep + libFolder + os.sep + libName)
-        self.lib.getInstance.restype = POINTER(c_void_p)
+        self.declarePrototypes()
         
         self.parser = None
         self.obj = self.lib.getInstance()
+        
+    def declarePrototypes(self):
+        
+        # the prototypes are declared once, so that each call only checks the 
+        # argument types instead of guessing the C conversion every time
+        p_float = POINTER(c_float)
+        prototypes = {'getInstance': ([], c_void_p),
+                      'newModel': ([c_void_p, c_char_p], None),
+                      'load': ([c_void_p], None),
+                      't_init': ([c_void_p, c_bool], None),
+                      't_loop': ([c_void_p, p_float, c_int], None),
+                      't_end': ([c_void_p], None),
+                      't_background': ([c_void_p], None),
+                      'e_enable': ([c_void_p, c_int, c_int, p_float, c_int, c_int, c_float, c_float, c_float, c_bool, c_bool], None),
+                      'e_postdict': ([c_void_p, p_float, p_float, c_bool], c_int),
+                      'e_generate': ([c_void_p, p_float], None),
+                      'e_save': ([c_void_p, c_char_p], None),
+                      'e_getState': ([c_void_p, p_float], None),
+                      'getStateDim': ([c_void_p], c_int),
+                      'getNDof': ([c_void_p], c_int),
+                      'getNLayers': ([c_void_p], c_int),
+                      'a_predict': ([c_void_p, c_char_p, c_int, p_float], None),
+                      'a_feedForwardOutputFromContext': ([c_void_p, p_float, p_float], None)}
+        
+        for name in prototypes.keys():
+            f = getattr(self.lib, name)
+            f.argtypes, f.restype = prototypes[name]
+            
+    def inBuffer(self, _v):
+        
+        # contiguous float32 arrays are passed as they are, anything else is converted once
+        v = np.ascontiguousarray(_v, dtype=np.float32)
+        return v, v.ctypes.data_as(POINTER(c_float))
+    
+    def outBuffer(self, _v):
+        
+        # the library writes into the array, so a converted copy would lose the result
+        if not (isinstance(_v, np.ndarray) and _v.dtype == np.float32 and _v.flags['C_CONTIGUOUS'] and _v.flags['WRITEABLE']):
+            raise TypeError("The output buffer should be a writeable and contiguous float32 numpy array")
+        return _v.ctypes.data_as(POINTER(c_float))
             
     def newModel(self, _propPath):
         
@@ -93,7 +134,7 @@ class NRL(object):
     
     def t_loop(self, _trainOut, _nLoop):        
         
-        self.lib.t_loop(self.obj, _trainOut, _nLoop);            
+        self.lib.t_loop(self.obj, self.outBuffer(_trainOut), _nLoop)
     
     def t_end(self):        
         
@@ -105,15 +146,36 @@ class NRL(object):
                                               
     def e_enable(self, _pId, _winSize, _w, _expTime, _epoch, _alpha, _beta1, _beta2, _storeStates=False, _storeER=False):
         
-        self.lib.e_enable(self.obj, _pId, _winSize, _w, _expTime, _epoch, _alpha, _beta1, _beta2, _storeStates, _storeER)
+        w, w_p = self.inBuffer(_w)
+        self.lib.e_enable(self.obj, _pId, _winSize, w_p, _expTime, _epoch, _alpha, _beta1, _beta2, _storeStates, _storeER)
         
     def e_postdict(self, _pos_win, _elbo, _showLog):
         
-        return self.lib.e_postdict(self.obj, _pos_win, _elbo, _showLog)
+        pos_win, pos_win_p = self.inBuffer(_pos_win)
+        return self.lib.e_postdict(self.obj, pos_win_p, self.outBuffer(_elbo), _showLog)
     
     def e_generate(self, _tgt_pos):
         
-        self.lib.e_generate(self.obj, _tgt_pos)
+        self.lib.e_generate(self.obj, self.outBuffer(_tgt_pos))
+
+    def generateBatch(self, _pIds, _nTimes, _init=None):
+        
+        # the library holds a single context, so the primitives are rolled out 
+        # one after the other into the same (batch, time, dim) layout as the NumPy engine
+        if not _init is None:
+            print("Error: the library can only start the batched generation from the primitives!")
+            return None, None
+        nDof = self.getNDof()
+        stateDim = self.getStateBufferSize()
+        w = np.full((self.getNLayers(),), 1.0e-5, dtype=np.float32)
+        Y = np.zeros((len(_pIds), _nTimes, nDof), dtype=np.float32)
+        S = np.zeros((len(_pIds), _nTimes, stateDim), dtype=np.float32)
+        for b, pId in enumerate(_pIds):
+            self.e_enable(int(pId), 1, w, _nTimes, 0, 0.0, 0.0, 0.0)
+            for t in range(_nTimes):
+                self.e_generate(Y[b,t])
+                self.e_getState(S[b,t])
+        return Y, S
 
     def e_save(self, _modelPath):
         
@@ -126,7 +188,7 @@ class NRL(object):
                        
     def e_getState(self,_v):    
         
-        self.lib.e_getState(self.obj, _v)
+        self.lib.e_getState(self.obj, self.outBuffer(_v))
         
 
     def e_getStateKey(self,_i): 
@@ -156,8 +218,10 @@ class NRL(object):
 
     def a_predict(self, _path, _n, _init_state):
         
-        self.lib.a_predict(self.obj, _path, _n, _init_state)	
+        init_state, init_state_p = self.inBuffer(_init_state)
+        self.lib.a_predict(self.obj, _path, _n, init_state_p)
 
     def a_feedForwardOutputFromContext(self, _context, _X):
         
-        self.lib.a_feedForwardOutputFromContext(self.obj, _context, _X);	
+        context, context_p = self.inBuffer(_context)
+        self.lib.a_feedForwardOutputFromContext(self.obj, context_p, self.outBuffer(_X))
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from tools.utils import Utils
+from tools.runner import HeadlessRunner
+from NRL import NRL
+from network.PVRNNEngine import PVRNNEngine
+
+def parseArguments(_argv):
+    
+    parser = argparse.ArgumentParser(description='Runs a VCBot experiment without the GUI, as fast as the library allows.')
+    parser.add_argument('--model', required=True, help='model name, as listed in data/config')
+    parser.add_argument('--primitive', type=int, default=1, help='initial primitive (starting at 1)')
+    parser.add_argument('--window', type=int, default=5, help='postdiction window size')
+    parser.add_argument('--w', default=None, help='regulation w for each layer, comma separated')
+    parser.add_argument('--epochs', type=int, default=15, help='postdiction epochs')
+    parser.add_argument('--alpha', type=float, default=0.3, help='Adam α')
+    parser.add_argument('--beta1', type=float, default=0.1, help='Adam β₁')
+    parser.add_argument('--beta2', type=float, default=0.95, help='Adam β₂')
+    parser.add_argument('--mc', type=float, default=0.9, help='motor compliance')
+    parser.add_argument('--steps', type=int, default=None, help='number of time steps (default 2000, or the dataset length with --rollout)')
+    parser.add_argument('--no-postdiction', dest='postdiction', action='store_false', help='disable the postdiction')
+    parser.add_argument('--backend', choices=['nrl', 'numpy'], default='nrl', help='libNRL or the NumPy engine (prior generation only)')
+    parser.add_argument('--rollout', default=None, help='instead of an experiment, roll out every primitive into this .npz file (outputs and states)')
+    parser.add_argument('--human', default=None, help='CSV file with the human trajectory (x, y[, interaction]), one row per time step')
+    return parser.parse_args(_argv)
+
+def main(_argv):
+    
+    args = parseArguments(_argv)
+    
+    dataDir = "data"
+    modelconfigdir = dataDir + '/config'
+    modeldatadir = dataDir + '/model'
+    datasetdir = dataDir + '/dataset'
+    experimentdir = dataDir + '/experiment'
+    
+    ut = Utils(os.getcwd())
+    if not ut.isDir(modelconfigdir):
+        print("Error: the headless runner must be started from the application folder!")
+        return 1
+    if not args.model in ut.getModelList(modelconfigdir):
+        print("Error: unknown model '{}'".format(args.model))
+        return 1
+    if not (ut.createDir(experimentdir) and ut.createDir(experimentdir + '/' + args.model)):
+        return 1
+    if not ut.installModel(modelconfigdir, modeldatadir, datasetdir, args.model):
+        return 1
+    
+    if args.backend == 'numpy':
+        nrl = PVRNNEngine()
+    else:
+        nrl = NRL()
+    runner = HeadlessRunner(nrl, ut, modelconfigdir, datasetdir, experimentdir)
+    if not runner.prepareDataset(args.model):
+        return 1
+    if not args.rollout is None:
+        t = time.perf_counter()
+        Y, S = runner.rollout(args.model, None, args.steps)
+        if Y is None:
+            return 1
+        np.savez(args.rollout, outputs=Y, states=S)
+        print("Rollout of {} primitives saved, {} steps in {:.3f}s".format(Y.shape[0], Y.shape[1], time.perf_counter() - t))
+        return 0
+    
+    p = runner.paramsFactory()
+    p['model'] = args.model
+    p['primitiveid'] = args.primitive
+    p['windowSize'] = args.window
+    if not args.w is None:
+        p['w'] = ut.parseString(args.w, 'float', ut.delimiter)
+    p['postdiction'] = args.postdiction
+    p['epochs'] = args.epochs
+    p['alpha'] = args.alpha
+    p['beta1'] = args.beta1
+    p['beta2'] = args.beta2
+    p['motorcompliance'] = args.mc
+    if not args.steps is None:
+        p['numbertimes'] = args.steps
+    
+    human = None
+    if not args.human is None:
+        human = runner.parseHuman(args.human)
+        if human is None:
+            return 1
+        
+    t = time.perf_counter()
+    e = runner.run(p, human)
+    if e is None:
+        return 1
+    print("Experiment \'{}\' saved, {} steps in {:.3f}s".format(e['datetime'], e['numbertimes'], time.perf_counter() - t))
+    return 0
+    
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -50,6 +50,8 @@
 import os
 from tools.utils import Utils
 from NRL import NRL
+from network.PVRNNEngine import PVRNNEngine
+from tools.modelcache import ModelCache
 from GUI.Main import Main
 
 def install(context):
@@ -81,20 +83,13 @@ def install(context):
         for d in createDir:
             ut.createDir(d)
             
-        absBasePath = os.path.abspath(".")
-    
         for mName in ut.getModelList(modelconfigdir):
             
             mExpDir = experimentdir + os.sep + mName
             if not ut.isDir('./'+ mExpDir) : 
                 ut.createDir(mExpDir)
 
-            mFileName = ut.modelPathString(modelconfigdir, mName)
-            m = ut.parseModel(mFileName)
-            m['modelpath'] = absBasePath + os.sep + modeldatadir.replace('/',os.sep) + os.sep + mName
-            m['datapath'] = absBasePath + os.sep + datasetdir.replace('/',os.sep) + os.sep + m['dsname']    
-             
-            if not ut.saveModel(mFileName, m, False):
+            if not ut.installModel(modelconfigdir, modeldatadir, datasetdir, mName):
                 print("Warning: the model {} seem to be corrupted!".format(mName))
                 break
              
@@ -104,8 +99,15 @@ def install(context):
     
     if success:
                     
+        try:
+            nrl = NRL()
+        except OSError:
+            print("Warning: the NRL library could not be loaded, the NumPy engine is used instead (no training nor postdiction)")
+            nrl = PVRNNEngine()
+            
         context['cwd'] = cwp
-        context['nrl'] = NRL()
+        context['nrl'] = nrl
+        context['modelcache'] = ModelCache(nrl)
         context['ut'] = ut
         context['m'] = None
         context['d'] = None
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import os
+import numpy as np
+from network.ParamArchive import ParamArchive
+from tools.datasetpack import DatasetPack
+
+class PVRNNEngine(object):
+    
+    """
+    NumPy implementation of the PV-RNN generation, with the same surface as NRL.
+    
+    The parameters are read from the files saved by libNRL, the matrices are 
+    stored in column-major order. At each step every layer computes the prior 
+    (p) and the posterior (q) branches from the previous state:
+    
+        u = tanh(W_u d + b_u [+ A_u]),  l = W_l d + b_l [+ A_l],  s = exp(l)
+        z = u + s * n
+        h = (1 - 1/t) h + 1/t (W_dd d + W_zd z + W_x d_x + b_d),  d = tanh(h)
+    
+    where A are the adaptive variables of the primitive and d_x the previous
+    state of the neighbour layers. The first qSteps steps follow the posterior 
+    so that the primitive is selected, then the prior is followed. Every output
+    is a softmax over dsoft reference points spread over the dataset range. 
+    
+    The state is kept with a batch dimension, so many trajectories are 
+    generated in one pass. The postdiction and the training need the gradients 
+    of the library and are not supported.
+    """
+    
+    def __init__(self, _seed=None):
+        
+        self.baseKeys = ['dp', 'hp', 'up', 'lp', 'sp', 'np', 'zp',\
+                         'dq', 'hq', 'uq', 'lq', 'sq', 'nq', 'zq']
+        self.delimiter = ','
+        self.parser = None
+        self.m = None
+        self.layers = []
+        self.Wo = None
+        self.bo = None
+        self.ref = None
+        self.nDof = 0
+        self.dSoft = 0
+        self.stateDim = 0
+        # the noise n is sampled only if stochastic is set, otherwise the means are followed
+        # the Training tab is disabled, the t_* entry points raise
+        self.canTrain = False
+        self.stochastic = False
+        self.qSteps = 1
+        self.rng = np.random.default_rng(_seed)
+        self.warned = False
+        self.batch = 0
+        
+    def readProperties(self, _fname):
+        
+        p = {}
+        with open(_fname) as f:
+            for line in f:
+                if '#' in line or not '=' in line:
+                    continue
+                k, v = line.strip().split('=', 1)
+                p[k] = v
+        return p
+    
+    def colMajor(self, _v, _nRows, _nCols):
+        
+        # a view over the archive, no copy is made
+        return np.reshape(_v, (_nRows, _nCols), order='F')
+            
+    def newModel(self, _propPath):
+        
+        if isinstance(_propPath, bytes):
+            _propPath = _propPath.decode('ascii')
+        self.m = self.readProperties(_propPath)
+        self.layers = []
+        self.batch = 0
+        
+    def setStateParser(self, _parser):
+        
+        self.parser = _parser
+        
+    def load(self):
+        
+        if self.m is None:
+            print("Error: newModel must be called before load!")
+            return
+        
+        mPath = self.m['modelpath']
+        dPath = self.m['datapath']
+        d = [int(v) for v in self.m['d'].split(self.delimiter)]
+        z = [int(v) for v in self.m['z'].split(self.delimiter)]
+        t = [float(v) for v in self.m['t'].split(self.delimiter)]
+        nLayers = len(d)
+        
+        ds = self.readProperties(dPath + os.sep + 'dataset.d')
+        nPrims = int(ds['numberprims'])
+        if DatasetPack.isStale(dPath):
+            X = [np.loadtxt(dPath + os.sep + 'primitive_{}_0.csv'.format(i), delimiter=self.delimiter, ndmin=2) for i in range(nPrims)]
+        else:
+            X = list(DatasetPack(dPath + os.sep + DatasetPack.fileName))
+        X = np.vstack(X)
+        
+        # only the parameters are memory-mapped from the binary archive of the 
+        # model, the Adam moments are never read since the engine does not train
+        A = ParamArchive.load(mPath)
+        if A is None:
+            return
+        
+        self.layers = []
+        for l in range(nLayers):
+            w = A.rows('L{}_w_p'.format(l))
+            b = A.rows('L{}_b_p'.format(l))
+            L = {}
+            L['d'] = d[l]
+            L['z'] = z[l]
+            L['tau'] = np.float32(1.0 / t[l])
+            L['Wdd'] = self.colMajor(w[0], d[l], d[l])
+            L['Wzd'] = self.colMajor(w[1], d[l], z[l])
+            # the four d->z maps (prior mean, prior log-sigma, posterior mean and 
+            # log-sigma) are stacked to compute them with a single product
+            L['Wz'] = np.vstack([self.colMajor(w[i], z[l], d[l]) for i in range(2,6)])
+            L['bd'] = b[0]
+            L['bz'] = np.concatenate(b[1:5])
+            # neighbour layers, top-down first and then bottom-up
+            L['x'] = []
+            i = 6
+            for n in [l + 1, l - 1]:
+                if n >= 0 and n < nLayers:
+                    L['x'].append((n, self.colMajor(w[i], d[l], d[n])))
+                    i = i + 1
+            L['Au'] = A.matrix('L{}_au_p'.format(l)).reshape(nPrims, -1, z[l])
+            L['Al'] = A.matrix('L{}_al_p'.format(l)).reshape(nPrims, -1, z[l])
+            self.layers.append(L)
+            
+        Wo = []
+        bo = []
+        k = 0
+        while 'o{}_w_p'.format(k) in A:
+            bo.append(A.rows('o{}_b_p'.format(k))[0])
+            Wo.append(self.colMajor(A.rows('o{}_w_p'.format(k))[0], len(bo[-1]), d[0]))
+            k = k + 1
+        self.nDof = k
+        self.dSoft = len(bo[0])
+        self.Wo = np.vstack(Wo)
+        self.bo = np.concatenate(bo)
+        self.ref = np.linspace(X.min(), X.max(), self.dSoft).astype(np.float32)
+        self.stateDim = sum([4 * L['d'] + 10 * L['z'] for L in self.layers])
+        
+    def t_init(self, _stdoutLog):
+        
+        raise RuntimeError("the training requires the NRL library")
+    
+    def t_loop(self, _trainOut, _nLoop):
+        
+        raise RuntimeError("the training requires the NRL library")
+    
+    def t_end(self):
+        
+        raise RuntimeError("the training requires the NRL library")
+    
+    def t_background(self):
+        
+        raise RuntimeError("the training requires the NRL library")
+    
+    def e_enable(self, _pId, _winSize, _w, _expTime, _epoch, _alpha, _beta1, _beta2, _storeStates=False, _storeER=False):
+        
+        self.e_enableBatch([_pId])
+        
+    def e_enableBatch(self, _pIds, _init=None):
+        
+        # one trajectory per primitive id, all of them start from the zero state
+        # unless initial state vectors are given, as in a_predict
+        self.pIds = np.array(_pIds, dtype=int)
+        self.batch = len(self.pIds)
+        self.t = 0
+        self.h = [np.zeros((self.batch, L['d']), dtype=np.float32) for L in self.layers]
+        self.d = [np.zeros((self.batch, L['d']), dtype=np.float32) for L in self.layers]
+        self.state = np.zeros((self.batch, self.stateDim), dtype=np.float32)
+        self.out = np.zeros((self.batch, self.nDof), dtype=np.float32)
+        
+        # views of the state buffer, in the order of the library state vector
+        self.stateViews = []
+        i = 0
+        for L in self.layers:
+            views = {}
+            for j, k in enumerate(self.baseKeys):
+                n = L['z']
+                if j in [0,1,7,8]:
+                    n = L['d']
+                views[k] = self.state[:,i:i+n]
+                i = i + n
+            self.stateViews.append(views)
+            
+        if not _init is None:
+            self.state[:] = np.asarray(_init, dtype=np.float32).reshape(self.batch, self.stateDim)
+            for l in range(len(self.layers)):
+                self.h[l][:] = self.stateViews[l]['hp']
+                self.d[l][:] = self.stateViews[l]['dp']
+            # the context already holds the intention, the prior is followed from the start
+            self.t = self.qSteps
+            
+    def generateBatch(self, _pIds, _nTimes, _init=None):
+        
+        # all the trajectories are rolled out together, the batch is vectorized in every step
+        self.e_enableBatch(_pIds, _init)
+        Y = np.zeros((self.batch, _nTimes, self.nDof), dtype=np.float32)
+        S = np.zeros((self.batch, _nTimes, self.stateDim), dtype=np.float32)
+        for t in range(_nTimes):
+            Y[:,t] = self.step()
+            S[:,t] = self.state
+        return Y, S
+            
+    def step(self):
+        
+        if self.batch == 0:
+            print("Error: e_enable must be called before the generation!")
+            return self.out
+        
+        posterior = self.t < self.qSteps
+        h = []
+        d = []
+        for l, L in enumerate(self.layers):
+            S = self.stateViews[l]
+            z = L['z']
+            dPrev = self.d[l]
+            tA = min(self.t, L['Au'].shape[1] - 1)
+            
+            a = dPrev @ L['Wz'].T + L['bz']
+            S['up'][:] = np.tanh(a[:,:z])
+            S['lp'][:] = a[:,z:2*z]
+            S['uq'][:] = np.tanh(a[:,2*z:3*z] + L['Au'][self.pIds, tA])
+            S['lq'][:] = a[:,3*z:] + L['Al'][self.pIds, tA]
+            S['sp'][:] = np.exp(S['lp'])
+            S['sq'][:] = np.exp(S['lq'])
+            if self.stochastic:
+                S['np'][:] = self.rng.standard_normal((self.batch, z), dtype=np.float32)
+                S['nq'][:] = self.rng.standard_normal((self.batch, z), dtype=np.float32)
+            S['zp'][:] = S['up'] + S['sp'] * S['np']
+            S['zq'][:] = S['uq'] + S['sq'] * S['nq']
+            
+            u = dPrev @ L['Wdd'].T + L['bd']
+            for n, W in L['x']:
+                u += self.d[n] @ W.T
+            hDecay = (1 - L['tau']) * self.h[l]
+            S['hp'][:] = hDecay + L['tau'] * (u + S['zp'] @ L['Wzd'].T)
+            S['hq'][:] = hDecay + L['tau'] * (u + S['zq'] @ L['Wzd'].T)
+            S['dp'][:] = np.tanh(S['hp'])
+            S['dq'][:] = np.tanh(S['hq'])
+            
+            if posterior:
+                h.append(S['hq'].copy())
+                d.append(S['dq'].copy())
+            else:
+                h.append(S['hp'].copy())
+                d.append(S['dp'].copy())
+                
+        self.h = h
+        self.d = d
+        self.t = self.t + 1
+        self.out[:] = self.decode(self.d[0])
+        return self.out
+    
+    def decode(self, _d):
+        
+        # softmax over the reference points of each output, then the expectation
+        a = (_d @ self.Wo.T + self.bo).reshape(-1, self.nDof, self.dSoft)
+        a = np.exp(a - a.max(axis=2, keepdims=True))
+        a /= a.sum(axis=2, keepdims=True)
+        return a @ self.ref
+        
+    def e_postdict(self, _pos_win, _elbo, _showLog):
+        
+        if not self.warned:
+            print("Warning: the postdiction requires the NRL library, the prior is followed instead!")
+            self.warned = True
+        _elbo[:] = 0
+        return 0
+    
+    def e_generate(self, _tgt_pos):
+        
+        _tgt_pos[...] = self.step().reshape(_tgt_pos.shape)
+        
+    def e_save(self, _modelPath):
+        
+        print("Error: saving the experiment state requires the NRL library!")
+        
+    def getStateBufferSize(self):
+        
+        return self.stateDim
+    
+    def e_getState(self, _v):
+        
+        _v[...] = self.state.reshape(_v.shape)
+        
+    def e_getStateKey(self,_i): 
+
+        if self.parser == None:
+             print("Error: the state parser is None, setStateParser must be called first!")
+             return None
+            
+        return self.parser.e_getStateKey(_i)
+        
+    def e_getStateMap(self,_v):        
+        
+        if self.parser == None:
+             print("Error: the state parser is None, setStateParser must be called first!")
+             return None
+            
+        return self.parser.e_getStateMap(_v)                   
+
+    def getNDof(self):
+        
+        return self.nDof
+    
+    def getNLayers(self):
+        
+        return len(self.layers)
+    
+    def a_predict(self, _path, _n, _init_state):
+        
+        print("Error: a_predict requires the NRL library!")
+        
+    def a_feedForwardOutputFromContext(self, _context, _X):
+        
+        _X[...] = self.decode(np.asarray(_context, dtype=np.float32).reshape(-1, self.layers[0]['d'])).reshape(_X.shape)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import os
+import sys
+import struct
+import numpy as np
+
+class ParamArchive(object):
+    
+    """
+    Single file container for the parameter files of a model folder.
+    
+    Only the parameters ('_p' files) needed for the inference are archived,
+    the Adam moments ('_m', '_v') are used by libNRL alone to resume the 
+    training and are never read.
+    
+    Every row of every parameter file is stored as float32 in one data block, and
+    a text index maps 'name,row,offset,count' to its position. The data block 
+    is memory-mapped, so opening an archive only reads the index and the 
+    tensors are views over the file. Rows of equal length are contiguous, so a
+    whole file can be viewed as a matrix without copying. On Windows, where a
+    mapped file cannot be replaced by its rebuild, the block is read into 
+    memory instead.
+    
+    libNRL still reads and writes the text files, the archive is rebuilt 
+    whenever one of them is newer.
+    """
+    
+    fileName = 'parameters.pvra'
+    magic = b'PVRA'
+    version = 1
+    headerFormat = '<4sIQ'
+    alignment = 64
+    
+    def __init__(self, _fname=None):
+        
+        self.fname = _fname
+        self.data = None
+        self.index = {}
+        if not _fname is None:
+            self.open(_fname)
+            
+    @staticmethod
+    def sourceFiles(_dir):
+        
+        return sorted([f for f in os.listdir(_dir) if f.endswith('_p.d')])
+    
+    @staticmethod
+    def isStale(_dir):
+        
+        fname = _dir + os.sep + ParamArchive.fileName
+        if not os.path.isfile(fname):
+            return True
+        t = os.path.getmtime(fname)
+        for f in ParamArchive.sourceFiles(_dir):
+            if os.path.getmtime(_dir + os.sep + f) > t:
+                return True
+        return False
+        
+    @staticmethod
+    def convert(_dir):
+        
+        # the archive is written next to its final name and then renamed, so 
+        # that concurrent readers never see a partial file
+        _fname = _dir + os.sep + ParamArchive.fileName
+        index = []
+        blocks = []
+        offset = 0
+        for f in ParamArchive.sourceFiles(_dir):
+            name = f[:-2]
+            with open(_dir + os.sep + f) as fd:
+                r = 0
+                for line in fd:
+                    line = line.strip()
+                    if len(line) == 0:
+                        continue
+                    v = np.array(line.split(','), dtype=np.float32)
+                    index.append('{},{},{},{}'.format(name, r, offset, v.size))
+                    blocks.append(v)
+                    offset = offset + v.size
+                    r = r + 1
+                    
+        idx = '\n'.join(index).encode('ascii')
+        head = struct.calcsize(ParamArchive.headerFormat) + len(idx)
+        pad = (-head) % ParamArchive.alignment
+        tmp = '{}.{}.tmp'.format(_fname, os.getpid())
+        with open(tmp, 'wb') as fd:
+            fd.write(struct.pack(ParamArchive.headerFormat, ParamArchive.magic, ParamArchive.version, len(idx)))
+            fd.write(idx)
+            fd.write(b'\0' * pad)
+            for v in blocks:
+                fd.write(v.tobytes())
+        os.replace(tmp, _fname)
+        return True
+    
+    @staticmethod
+    def load(_dir):
+        
+        # rebuilds the archive if needed, returns None when it cannot be read
+        _fname = _dir + os.sep + ParamArchive.fileName
+        try:
+            if ParamArchive.isStale(_dir):
+                ParamArchive.convert(_dir)
+            try:
+                return ParamArchive(_fname)
+            except ValueError:
+                # written by another version, rebuilt once
+                ParamArchive.convert(_dir)
+                return ParamArchive(_fname)
+        except (IOError, ValueError) as err:
+            print("Error: the parameter archive \'{}\' could not be loaded ({})".format(_fname, err))
+            return None
+    
+    def open(self, _fname):
+        
+        self.fname = _fname
+        self.index = {}
+        hSize = struct.calcsize(self.headerFormat)
+        with open(_fname, 'rb') as fd:
+            magic, version, nIdx = struct.unpack(self.headerFormat, fd.read(hSize))
+            if magic != self.magic or version != self.version:
+                raise ValueError("unknown format")
+            idx = fd.read(nIdx).decode('ascii')
+        dataStart = hSize + nIdx
+        dataStart = dataStart + (-dataStart) % self.alignment
+        
+        for line in idx.split('\n'):
+            if len(line) == 0:
+                continue
+            name, r, offset, count = line.split(',')
+            if not name in self.index:
+                self.index[name] = []
+            self.index[name].append((int(offset), int(count)))
+            
+        self.data = np.zeros((0,), dtype=np.float32)
+        if os.path.getsize(_fname) > dataStart:
+            if sys.platform == "win32":
+                self.data = np.fromfile(_fname, dtype=np.float32, offset=dataStart)
+            else:
+                self.data = np.memmap(_fname, dtype=np.float32, mode='r', offset=dataStart)
+        
+    def names(self):
+        
+        return list(self.index.keys())
+    
+    def __contains__(self, _name):
+        
+        return _name in self.index
+        
+    def rows(self, _name):
+        
+        return [self.data[o:o+n] for o, n in self.index[_name]]
+    
+    def matrix(self, _name):
+        
+        # (rows, cols) view, only for files whose rows have the same length
+        rows = self.index[_name]
+        n = rows[0][1]
+        for o, c in rows:
+            if c != n:
+                raise ValueError("the rows of \'{}\' have different lengths".format(_name))
+        o = rows[0][0]
+        return self.data[o:o+n*len(rows)].reshape(len(rows), n)
+    
+if __name__ == '__main__':
+    
+    # converts the model folders given as arguments
+    for d in sys.argv[1:]:
+        ParamArchive.convert(d)
+        print("{} converted".format(d))
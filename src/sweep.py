@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import os
+import sys
+import time
+import argparse
+import itertools
+import multiprocessing
+from tools.utils import Utils
+from tools.runner import HeadlessRunner
+
+dataDir = "data"
+modelconfigdir = dataDir + '/config'
+modeldatadir = dataDir + '/model'
+datasetdir = dataDir + '/dataset'
+experimentdir = dataDir + '/experiment'
+
+# one runner per worker process, each one with its own libNRL instance
+runner = None
+human = None
+
+def initWorker(_backend, _human):
+    
+    global runner
+    global human
+    
+    if _backend == 'numpy':
+        from network.PVRNNEngine import PVRNNEngine
+        nrl = PVRNNEngine()
+    else:
+        from NRL import NRL
+        nrl = NRL()
+    runner = HeadlessRunner(nrl, Utils(os.getcwd()), modelconfigdir, datasetdir, experimentdir)
+    human = _human
+
+def runTask(_task):
+    
+    i, p = _task
+    t = time.perf_counter()
+    e = runner.run(p, human)
+    dt = None
+    if not e is None:
+        dt = e['datetime']
+    return i, dt, time.perf_counter() - t
+
+def parseArguments(_argv):
+    
+    parser = argparse.ArgumentParser(description='Runs a grid of VCBot experiments without the GUI, one worker process per core.')
+    parser.add_argument('--model', nargs='+', required=True, help='model names, as listed in data/config')
+    parser.add_argument('--primitive', type=int, nargs='+', default=[1], help='initial primitives (starting at 1)')
+    parser.add_argument('--window', type=int, nargs='+', default=[5], help='postdiction window sizes')
+    parser.add_argument('--w', nargs='+', default=[None], help='regulation w settings, each one comma separated per layer')
+    parser.add_argument('--epochs', type=int, nargs='+', default=[15], help='postdiction epochs')
+    parser.add_argument('--mc', type=float, nargs='+', default=[0.9], help='motor compliances')
+    parser.add_argument('--postdiction', choices=['on', 'off'], nargs='+', default=['on'], help='postdiction enabled or disabled')
+    parser.add_argument('--alpha', type=float, default=0.3, help='Adam α')
+    parser.add_argument('--beta1', type=float, default=0.1, help='Adam β₁')
+    parser.add_argument('--beta2', type=float, default=0.95, help='Adam β₂')
+    parser.add_argument('--steps', type=int, default=2000, help='number of time steps')
+    parser.add_argument('--backend', choices=['nrl', 'numpy'], default='nrl', help='libNRL or the NumPy engine (prior generation only)')
+    parser.add_argument('--human', default=None, help='CSV file with the human trajectory (x, y[, interaction]), one row per time step')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of worker processes')
+    return parser.parse_args(_argv)
+
+def main(_argv):
+    
+    args = parseArguments(_argv)
+    
+    ut = Utils(os.getcwd())
+    if not ut.isDir(modelconfigdir):
+        print("Error: the sweep must be started from the application folder!")
+        return 1
+    
+    # the model files are installed and the datasets compacted once here, 
+    # the workers only read them
+    parent = HeadlessRunner(None, ut, modelconfigdir, datasetdir, experimentdir)
+    mList = ut.getModelList(modelconfigdir)
+    if not ut.createDir(experimentdir):
+        return 1
+    nLayers = {}
+    for mName in args.model:
+        if not mName in mList:
+            print("Error: unknown model '{}'".format(mName))
+            return 1
+        if not (ut.createDir(experimentdir + '/' + mName) and ut.installModel(modelconfigdir, modeldatadir, datasetdir, mName)):
+            return 1
+        if not parent.prepareDataset(mName):
+            return 1
+        nLayers[mName] = ut.parseModel(ut.modelPathString(modelconfigdir, mName))['nlayers']
+        
+    wList = []
+    for w in args.w:
+        if w is None:
+            wList.append(None)
+        else:
+            wList.append(ut.parseString(w, 'float', ut.delimiter))
+    for mName in args.model:
+        for w in wList:
+            if not w is None and len(w) != nLayers[mName]:
+                print("Error: the model '{}' has {} layers, w={} is skipped".format(mName, nLayers[mName], w))
+    
+    tasks = []
+    grid = itertools.product(args.model, args.primitive, args.window, wList, args.epochs, args.mc, args.postdiction)
+    for mName, primitive, window, w, epochs, mc, postdiction in grid:
+        if not w is None and len(w) != nLayers[mName]:
+            continue
+        p = {}
+        p['model'] = mName
+        p['primitiveid'] = primitive
+        p['windowSize'] = window
+        p['w'] = w
+        p['postdiction'] = postdiction == 'on'
+        p['epochs'] = epochs
+        p['alpha'] = args.alpha
+        p['beta1'] = args.beta1
+        p['beta2'] = args.beta2
+        p['motorcompliance'] = mc
+        p['numbertimes'] = args.steps
+        tasks.append((len(tasks), p))
+    if len(tasks) == 0:
+        print("Error: the grid is empty")
+        return 1
+    
+    human = None
+    if not args.human is None:
+        human = parent.parseHuman(args.human)
+        if human is None:
+            return 1
+    
+    nWorkers = max(1, min(args.workers, len(tasks)))
+    print("Running {} experiments on {} workers".format(len(tasks), nWorkers))
+    
+    # the workers already use all the cores, the library and BLAS are kept 
+    # single threaded; the variables are read when a worker imports numpy, so
+    # they are set here and inherited by the spawned workers
+    for k in ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS']:
+        os.environ.setdefault(k, '1')
+    
+    # spawn instead of fork, so that no library state is inherited by the workers
+    nFailed = 0
+    t = time.perf_counter()
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(nWorkers, initWorker, (args.backend, human)) as pool:
+        for i, dt, dti in pool.imap_unordered(runTask, tasks):
+            p = tasks[i][1]
+            if dt is None:
+                nFailed = nFailed + 1
+                print("[{}/{}] {} failed".format(i + 1, len(tasks), p))
+            else:
+                print("[{}/{}] {}/{} saved in {:.3f}s".format(i + 1, len(tasks), p['model'], dt, dti))
+    print("{} experiments in {:.3f}s, {} failed".format(len(tasks), time.perf_counter() - t, nFailed))
+    
+    if nFailed > 0:
+        return 1
+    return 0
+    
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import warnings
+import numpy as np
+from scipy import stats
+from concurrent.futures import ThreadPoolExecutor
+
+class ExperimentAggregate(object):
+    
+    """
+    Per time step statistics across several experiments of the same model.
+    
+    The runs are loaded by a thread pool, each worker reduces its run to the 
+    ELBO terms, the squared error between the robot position and intention,
+    and the mean over the neurons of every state variable of every layer. 
+    The runs are aligned on time and the mean with its confidence interval 
+    (Student's t) is computed at every step over the runs covering it.
+    """
+    
+    def __init__(self, _ut, _d, _z, _confidence=0.95):
+        
+        self.ut = _ut
+        self.d = _d
+        self.z = _z
+        self.confidence = _confidence
+        self.baseKeys = ['dp', 'hp', 'mp', 'lp', 'sp', 'np', 'zp',\
+                         'dq', 'hq', 'mq', 'lq', 'sq', 'nq', 'zq']
+        
+        # state column ranges of every layer variable
+        self.slices = []
+        self.labels = []
+        j = 0
+        for l in range(len(self.d)):
+            sizes = [self.d[l], self.d[l]] + [self.z[l]] * 5 + [self.d[l], self.d[l]] + [self.z[l]] * 5
+            for k, n in zip(self.baseKeys, sizes):
+                self.slices.append((j, j + n))
+                self.labels.append('{} (Layer {})'.format(k, l+1))
+                j = j + n
+                
+    def reduceRun(self, _path):
+        
+        e = self.ut.parseExperiment(_path)
+        if e is None:
+            return None
+        states = e['states']
+        r = {}
+        r['name'] = e['datetime']
+        r['period'] = int(e['samplingperiod'])
+        r['elbo'] = np.asarray(e['elbo'], dtype=np.float64)
+        r['mse'] = np.mean(np.square(np.asarray(e['cur_pos'], dtype=np.float64) - e['tgt_pos']), axis=1)
+        r['state'] = np.stack([np.mean(states[:,a:b], axis=1, dtype=np.float64) for a, b in self.slices], axis=1)
+        return r
+    
+    def load(self, _paths, _workers=8):
+        
+        # numpy releases the GIL while reading and reducing, so the threads overlap
+        with ThreadPoolExecutor(max_workers=_workers) as pool:
+            runs = list(pool.map(self.reduceRun, _paths))
+        return [r for r in runs if not r is None]
+    
+    def align(self, _runs, _key):
+        
+        # every run on the common time grid, NaN past its end; runs with 
+        # another sampling period are interpolated
+        period = min([r['period'] for r in _runs])
+        duration = max([(r[_key].shape[0] - 1) * r['period'] for r in _runs])
+        times = np.arange(0, duration + period, period, dtype=np.float64)
+        first = _runs[0][_key]
+        width = 1 if len(first.shape) == 1 else first.shape[1]
+        X = np.full((len(_runs), times.shape[0], width), np.nan)
+        for i, r in enumerate(_runs):
+            Y = r[_key].reshape(r[_key].shape[0], -1)
+            n = Y.shape[0]
+            if r['period'] == period:
+                X[i,:n] = Y
+            else:
+                t = np.arange(n) * r['period']
+                m = times <= t[-1]
+                for c in range(width):
+                    X[i,m,c] = np.interp(times[m], t, Y[:,c])
+        return times / 1000.0, X
+    
+    def summarize(self, _X):
+        
+        # mean and half width of the confidence interval over the runs at every step
+        n = np.sum(~np.isnan(_X[:,:,0]), axis=0)
+        with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mean = np.nanmean(_X, axis=0)
+            sd = np.nanstd(_X, axis=0, ddof=1)
+            q = stats.t.ppf(0.5 + self.confidence / 2.0, np.maximum(n - 1, 1))
+            ci = q[:,None] * sd / np.sqrt(n)[:,None]
+        ci[n < 2] = np.nan
+        return mean, ci, n
+    
+    def compute(self, _paths, _workers=8):
+        
+        runs = self.load(_paths, _workers)
+        if len(runs) == 0:
+            return None
+        a = {}
+        a['runs'] = [r['name'] for r in runs]
+        a['labels'] = self.labels
+        a['keys'] = self.baseKeys
+        for k in ['elbo', 'mse', 'state']:
+            times, X = self.align(runs, k)
+            a[k + '_mean'], a[k + '_ci'], a['n'] = self.summarize(X)
+            a['time'] = times
+        a['mse_mean'] = a['mse_mean'][:,0]
+        a['mse_ci'] = a['mse_ci'][:,0]
+        return a
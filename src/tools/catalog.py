@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import os
+import re
+import sqlite3
+import numpy as np
+
+class ExperimentCatalog(object):
+    
+    """
+    SQLite index of the saved experiments, one row per experiment folder.
+    
+    The metadata of the header and summary statistics of the ELBO columns 
+    (sum, mean and sample standard deviation) are stored when an experiment 
+    is saved, so listing and filtering runs only reads the database.
+    """
+    
+    fileName = 'catalog.sqlite'
+    textKeys = ['model', 'datetime', 'dataset', 'w', 'postdiction']
+    numberKeys = ['numbertimes', 'samplingperiod', 'primitiveid', 'windowSize', 
+                  'epochs', 'alpha', 'beta1', 'beta2', 'motorcompliance']
+    statKeys = ['elbo', 'rec', 'reg']
+    operators = ['<=', '>=', '!=', '=', '<', '>']
+    
+    def __init__(self, _fname):
+        
+        self.fname = _fname
+        self.columns = self.textKeys + self.numberKeys
+        for k in self.statKeys:
+            self.columns = self.columns + [k + '_sum', k + '_mean', k + '_stdev']
+        cols = ['{} TEXT'.format(k) for k in self.textKeys]
+        cols = cols + ['{} REAL'.format(k) for k in self.columns[len(self.textKeys):]]
+        self.execute(['CREATE TABLE IF NOT EXISTS experiments ({}, PRIMARY KEY (model, datetime))'.format(', '.join(cols))], [()])
+        
+    def execute(self, _sql, _args):
+        
+        # one transaction per call, several sweep workers may save at the same
+        # time and sqlite serialises the writers
+        db = sqlite3.connect(self.fname, timeout=30)
+        try:
+            rows = []
+            with db:
+                for sql, args in zip(_sql, _args):
+                    rows = db.execute(sql, args).fetchall()
+            return rows
+        finally:
+            db.close()
+    
+    def summary(self, _e):
+        
+        row = {}
+        elbo = np.asarray(_e['elbo'], dtype=np.float64)
+        n = elbo.shape[0]
+        for i, k in enumerate(self.statKeys):
+            row[k + '_sum'] = float(np.sum(elbo[:,i])) if n > 0 else 0.0
+            row[k + '_mean'] = float(np.mean(elbo[:,i])) if n > 0 else None
+            row[k + '_stdev'] = float(np.std(elbo[:,i], ddof=1)) if n > 1 else None
+        return row
+        
+    def add(self, _e):
+        
+        row = {}
+        for k in self.textKeys + self.numberKeys:
+            row[k] = _e.get(k)
+        row.update(self.summary(_e))
+        self.execute(['INSERT OR REPLACE INTO experiments ({}) VALUES ({})'.format(', '.join(self.columns), ', '.join(['?'] * len(self.columns)))],
+                     [[row[k] for k in self.columns]])
+            
+    def remove(self, _model, _datetime):
+        
+        self.execute(['DELETE FROM experiments WHERE model = ? AND datetime = ?'], [(_model, _datetime)])
+    
+    def sync(self, _modelDir, _model, _ut):
+        
+        # only the names of the folders are listed, the experiments missing 
+        # from the catalog (saved before it existed) are parsed once
+        dList = _ut.getDirList(_modelDir)
+        if dList is None:
+            return
+        known = set(self.list(_model))
+        for eName in set(dList) - known:
+            e = _ut.parseExperiment(_modelDir + '/' + eName)
+            if not e is None:
+                self.add(e)
+        gone = list(known - set(dList))
+        self.execute(['DELETE FROM experiments WHERE model = ? AND datetime = ?'] * len(gone), [(_model, eName) for eName in gone])
+    
+    def parseFilter(self, _text):
+        
+        # 'key<op>value' conditions separated by ';', e.g. 'primitiveid=2; motorcompliance>=0.5'
+        conditions = []
+        for c in _text.split(';'):
+            c = c.strip()
+            if len(c) == 0:
+                continue
+            m = re.match(r'^(\w+)\s*(<=|>=|!=|=|<|>)\s*(.*)$', c)
+            if m is None or not m.group(1) in self.columns:
+                raise ValueError("invalid condition \'{}\'".format(c))
+            conditions.append((m.group(1), m.group(2), m.group(3).strip()))
+        return conditions
+    
+    def query(self, _model, _conditions=[]):
+        
+        # rows of the model matching all the conditions, the newest first
+        sql = 'SELECT {} FROM experiments WHERE model = ?'.format(', '.join(self.columns))
+        args = [_model]
+        for k, op, v in _conditions:
+            sql = sql + ' AND {} {} ?'.format(k, op)
+            if not k in self.textKeys:
+                v = float(v)
+            args.append(v)
+        sql = sql + ' ORDER BY datetime DESC'
+        rows = self.execute([sql], [args])
+        return [dict(zip(self.columns, r)) for r in rows]
+    
+    def list(self, _model, _conditions=[]):
+        
+        return [r['datetime'] for r in self.query(_model, _conditions)]
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+
+
+import time
+import threading
+import numpy as np
+
+class RingBuffer(object):
+    
+    def __init__(self, _size, _fields):
+        
+        # single producer, single consumer: the producer fills a slot and only
+        # then advances 'head', the consumer keeps its own read position, so
+        # no lock is taken on either side. Every slot carries the number of 
+        # the sample it holds, -1 while it is written, so a consumer that fell
+        # a full buffer behind detects the overwritten slots and drops them
+        self.size = _size
+        self.head = 0
+        self.dropped = 0
+        self.seq = np.full((_size,), -1, dtype=np.int64)
+        self.fields = {}
+        for k in _fields.keys():
+            shape, dtype = _fields[k]
+            self.fields[k] = np.zeros((_size,) + shape, dtype=dtype)
+            
+    def push(self, _src):
+        
+        n = self.head
+        i = n % self.size
+        self.seq[i] = -1
+        for k in self.fields.keys():
+            self.fields[k][i] = getattr(_src, k)
+        self.seq[i] = n
+        self.head = n + 1
+        
+    def read(self, _tail):
+        
+        # when the consumer is more than a full buffer behind the oldest samples are lost
+        head = self.head
+        tail = max(_tail, head - self.size)
+        self.dropped = self.dropped + tail - _tail
+        return tail, head
+    
+    def fetch(self, _n):
+        
+        # a copy of sample _n, None if the producer overwrote it before or 
+        # while it was copied
+        i = _n % self.size
+        if not self.seq[i] == _n:
+            self.dropped = self.dropped + 1
+            return None
+        sample = {}
+        for k in self.fields.keys():
+            sample[k] = self.fields[k][i].copy()
+        if not self.seq[i] == _n:
+            self.dropped = self.dropped + 1
+            return None
+        return sample
+    
+        
+class Scheduler(object):
+    
+    def __init__(self, _samplingPeriod, _nTicks):
+        
+        # deadlines are absolute multiples of the sampling period from the 
+        # start of a run segment, in nanoseconds of the performance counter
+        self.period = int(_samplingPeriod*1000000)
+        self.nTicks = _nTicks
+        self.n = 0
+        self.k = 0
+        self.t0 = 0
+        self.missed = 0
+        self.times = np.zeros((_nTicks,), dtype=np.int64)
+        self.lateness = np.zeros((_nTicks,), dtype=np.int64)
+        self.compute = np.zeros((_nTicks,), dtype=np.int64)
+        self.segment = np.zeros((_nTicks,), dtype=bool)
+        self.histEdges = np.array([0.0, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0, np.inf])
+        self.renderHist = np.zeros((len(self.histEdges)-1,), dtype=np.int64)
+        self.renderSum = 0
+        self.renderMax = 0
+        
+    def start(self):
+        
+        # a new segment starts at every (re)start of the experiment
+        self.t0 = time.perf_counter_ns()
+        self.k = 0
+        
+    def wait(self, _stopEvent):
+        
+        deadline = self.t0 + self.k*self.period
+        now = time.perf_counter_ns()
+        if now < deadline:
+            if _stopEvent.wait((deadline - now)/1.0e9):
+                return False
+            now = time.perf_counter_ns()
+        elif self.period > 0 and now - deadline >= self.period:
+            # deadlines that already passed are skipped to stay on the grid
+            missed = (now - deadline) // self.period
+            self.k = self.k + missed
+            self.missed = self.missed + missed
+            deadline = deadline + missed*self.period
+            
+        if self.n < self.nTicks:
+            self.times[self.n] = now
+            self.lateness[self.n] = now - deadline
+            self.segment[self.n] = (self.k == 0)
+        self.k = self.k + 1
+        return True
+    
+    def tickDone(self, _computeTime):
+        
+        if self.n < self.nTicks:
+            self.compute[self.n] = _computeTime
+            self.n = self.n + 1
+            
+    def recordRender(self, _renderTime):
+        
+        ms = _renderTime/1.0e6
+        self.renderHist[np.searchsorted(self.histEdges, ms, side='right') - 1] += 1
+        self.renderSum = self.renderSum + _renderTime
+        self.renderMax = max(self.renderMax, _renderTime)
+        
+    def getSummary(self):
+        
+        n = self.n
+        lateness = self.lateness[:n]/1.0e6
+        compute = self.compute[:n]/1.0e6
+        # periods measured between consecutive ticks of the same segment
+        periods = (np.diff(self.times[:n])/1.0e6)[~self.segment[1:n]]
+        nRender = int(np.sum(self.renderHist))
+        
+        def fmt(_v):
+            return '{:.4f}'.format(_v)
+        
+        def hist(_v):
+            return ','.join(['{}'.format(c) for c in np.histogram(_v, self.histEdges)[0]])
+        
+        s = {}
+        s['ticks'] = '{}'.format(n)
+        s['missedticks'] = '{}'.format(self.missed)
+        s['periodmean'] = fmt(np.mean(periods)) if len(periods) > 0 else ''
+        s['periodstdev'] = fmt(np.std(periods)) if len(periods) > 0 else ''
+        s['latenessmean'] = fmt(np.mean(lateness)) if n > 0 else ''
+        s['latenessmax'] = fmt(np.max(lateness)) if n > 0 else ''
+        s['computemean'] = fmt(np.mean(compute)) if n > 0 else ''
+        s['computemax'] = fmt(np.max(compute)) if n > 0 else ''
+        s['rendermean'] = fmt(self.renderSum/1.0e6/nRender) if nRender > 0 else ''
+        s['rendermax'] = fmt(self.renderMax/1.0e6)
+        s['histedges'] = ','.join(['{}'.format(e) for e in self.histEdges[:-1]])
+        s['latenesshist'] = hist(lateness)
+        s['computehist'] = hist(compute)
+        s['renderhist'] = ','.join(['{}'.format(c) for c in self.renderHist])
+        return s
+    
+        
+class ControlLoop(threading.Thread):
+    
+    def __init__(self, _session, _recorder, _ring, _input, _scheduler, _nSteps):
+        
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.session = _session
+        self.recorder = _recorder
+        self.ring = _ring
+        self.input = _input
+        self.scheduler = _scheduler
+        self.nSteps = _nSteps
+        self.finished = False
+        self.stopEvent = threading.Event()
+        
+    def run(self):
+        
+        self.scheduler.start()
+        
+        while not self.stopEvent.is_set():
+            
+            if self.session.step >= self.nSteps:
+                self.finished = True
+                break
+            
+            if not self.scheduler.wait(self.stopEvent):
+                break
+            
+            t = time.perf_counter_ns()
+            hXY, interaction, mc = self.input()
+            self.session.doStep(hXY, interaction, mc)
+            self.recorder.record(self.session)
+            self.ring.push(self.session)
+            self.scheduler.tickDone(time.perf_counter_ns() - t)
+                
+    def stop(self):
+        
+        self.stopEvent.set()
+        if self.is_alive() and not threading.current_thread() is self:
+            self.join()
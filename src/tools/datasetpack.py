@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import os
+import struct
+import numpy as np
+from sys import platform as _platform
+
+class DatasetPack(object):
+    
+    """
+    Packed copy of the primitives of a dataset folder.
+    
+    All the primitives are stored as float64, the type the CSV files are 
+    parsed to, in one data block after a table of (offset, rows, columns) per
+    primitive, in the order of the dataset. The block is memory-mapped, so 
+    opening a pack only reads the table and every primitive is a (rows, 
+    columns) view over the file. On Windows, where a mapped file cannot be 
+    replaced by its rebuild, the block is read into memory instead.
+    
+    The CSV files remain the source read by libNRL, the pack is rebuilt when
+    the dataset folder or its header are newer, or when it was written by 
+    another version.
+    """
+    
+    fileName = 'primitives.pvd'
+    magic = b'PVDS'
+    version = 2
+    dtype = np.dtype('<f8')
+    headerFormat = '<4sIQ'
+    alignment = 64
+    
+    def __init__(self, _fname):
+        
+        self.fname = _fname
+        self.table = np.zeros((0, 3), dtype=np.int64)
+        self.data = None
+        self.open(_fname)
+        
+    @staticmethod
+    def isStale(_dsDir):
+        
+        # adding, removing or renaming a primitive file changes the folder, 
+        # the edition of the dataset rewrites its header
+        fname = _dsDir + os.sep + DatasetPack.fileName
+        if not os.path.isfile(fname):
+            return True
+        hSize = struct.calcsize(DatasetPack.headerFormat)
+        with open(fname, 'rb') as fd:
+            head = fd.read(hSize)
+        if len(head) < hSize or struct.unpack(DatasetPack.headerFormat, head)[:2] != (DatasetPack.magic, DatasetPack.version):
+            return True
+        t = os.stat(fname).st_mtime_ns
+        for f in [_dsDir, _dsDir + os.sep + 'dataset.d', _dsDir + os.sep + 'manifest.d']:
+            if os.path.exists(f) and os.stat(f).st_mtime_ns > t:
+                return True
+        return False
+    
+    @staticmethod
+    def write(_dsDir, _Xs):
+        
+        # written next to its final name and renamed, concurrent readers never
+        # see a partial file
+        fname = _dsDir + os.sep + DatasetPack.fileName
+        table = np.zeros((len(_Xs), 3), dtype=np.int64)
+        offset = 0
+        for i, X in enumerate(_Xs):
+            X = X.reshape(X.shape[0], -1)
+            table[i] = (offset, X.shape[0], X.shape[1])
+            offset = offset + X.size
+        head = struct.calcsize(DatasetPack.headerFormat) + table.nbytes
+        pad = (-head) % DatasetPack.alignment
+        tmp = '{}.{}.tmp'.format(fname, os.getpid())
+        with open(tmp, 'wb') as fd:
+            fd.write(struct.pack(DatasetPack.headerFormat, DatasetPack.magic, DatasetPack.version, len(_Xs)))
+            fd.write(table.tobytes())
+            fd.write(b'\0' * pad)
+            for X in _Xs:
+                fd.write(np.ascontiguousarray(X, dtype=DatasetPack.dtype).tobytes())
+        os.replace(tmp, fname)
+        # the rename updates the folder, the pack takes its time to stay fresh
+        st = os.stat(_dsDir)
+        os.utime(fname, ns=(st.st_atime_ns, st.st_mtime_ns))
+        return True
+        
+    def open(self, _fname):
+        
+        hSize = struct.calcsize(self.headerFormat)
+        with open(_fname, 'rb') as fd:
+            magic, version, n = struct.unpack(self.headerFormat, fd.read(hSize))
+            if magic != self.magic or version != self.version:
+                raise ValueError("unknown format")
+            self.table = np.frombuffer(fd.read(n * 24), dtype=np.int64).reshape(n, 3)
+        dataStart = hSize + self.table.nbytes
+        dataStart = dataStart + (-dataStart) % self.alignment
+        
+        self.data = np.zeros((0,), dtype=self.dtype)
+        if os.path.getsize(_fname) > dataStart:
+            if _platform == "win32":
+                self.data = np.fromfile(_fname, dtype=self.dtype, offset=dataStart)
+            else:
+                self.data = np.memmap(_fname, dtype=self.dtype, mode='r', offset=dataStart)
+    
+    def __len__(self):
+        
+        return self.table.shape[0]
+    
+    def __getitem__(self, _i):
+        
+        if _i < 0:
+            _i = _i + len(self)
+        if _i < 0 or _i >= len(self):
+            raise IndexError("primitive index out of range")
+        o, r, c = self.table[_i]
+        return self.data[o:o+r*c].reshape(r, c)
+    
+    def __iter__(self):
+        
+        for i in range(len(self)):
+            yield self[i]
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import os
+from tools.datasetpack import DatasetPack
+
+class DatasetStore(object):
+    
+    """
+    Primitive files of a dataset folder with a manifest giving their order.
+    
+    Every primitive keeps the file it was recorded in, the manifest lists 
+    the file numbers in the order of the dataset. Appending or removing a 
+    primitive writes or deletes one file and rewrites the manifest and the 
+    header, reordering only rewrites the manifest. The network library reads 
+    primitive_<i>_0.csv for i = 0..n-1, compact() renames the files to that 
+    numbering before training. The primitives are read through a DatasetPack
+    rebuilt from the CSV files after an edition.
+    """
+    
+    manifestFileName = 'manifest.d'
+    
+    def __init__(self, _ut, _dsDir, _d):
+        
+        self.ut = _ut
+        self.dir = _dsDir
+        self.d = _d
+        self.ids = self.readManifest()
+        if self.ids is None:
+            # datasets saved without a manifest are numbered contiguously
+            self.ids = list(range(int(self.d['numberprims'])))
+    
+    def __len__(self):
+        
+        return len(self.ids)
+    
+    def primitivePath(self, _id):
+        
+        return '{}/{}{}_0{}'.format(self.dir, self.ut.primFilePrefix, _id, self.ut.primFileSufix)
+    
+    def paths(self):
+        
+        return [self.primitivePath(i) for i in self.ids]
+    
+    def readCsv(self):
+        
+        return [self.ut.readData(p, _delimiter=self.ut.delimiter) for p in self.paths()]
+    
+    def load(self):
+        
+        # views over the packed primitives, the pack is rebuilt from the CSV 
+        # files once after every edition of the dataset
+        try:
+            if DatasetPack.isStale(self.dir):
+                self.importCsv()
+            return DatasetPack(self.dir + '/' + DatasetPack.fileName)
+        except (IOError, ValueError) as err:
+            print("Warning: the dataset pack of \'{}\' could not be used ({})".format(self.dir, err))
+        return self.readCsv()
+    
+    def importCsv(self):
+        
+        return DatasetPack.write(self.dir, self.readCsv())
+    
+    def exportCsv(self):
+        
+        # rewrites the CSV layout read by libNRL from the pack, in the order 
+        # of the dataset
+        try:
+            pack = DatasetPack(self.dir + '/' + DatasetPack.fileName)
+            ids = list(self.ids)
+            self.ids = list(range(len(pack)))
+            for i in range(len(pack)):
+                if not self.ut.saveData(self.primitivePath(i), pack[i]):
+                    self.ids = ids
+                    return False
+            for fId in ids:
+                if fId >= len(pack):
+                    self.ut.removeFile(self.primitivePath(fId))
+            self.writeManifest()
+        except (IOError, ValueError) as err:
+            print("Error: the dataset pack of \'{}\' could not be exported ({})".format(self.dir, err))
+            return False
+        return True
+    
+    def readManifest(self):
+        
+        fname = self.dir + '/' + self.manifestFileName
+        if not self.ut.fileExists(fname):
+            return None
+        with open(fname) as f:
+            for line in f:
+                if line.startswith('primitives='):
+                    return self.ut.parseString(line.strip()[len('primitives='):], 'int', self.ut.delimiter)
+        return []
+    
+    def writeManifest(self):
+        
+        # the header and the manifest are written aside and renamed
+        self.d['numberprims'] = '{}'.format(len(self.ids))
+        self.ut.saveDatasetHeader(self.dir, self.d)
+        fname = self.dir + '/' + self.manifestFileName
+        with open(fname + '.tmp', 'w') as f:
+            f.write('primitives=' + self.ut.delimiter.join(['{}'.format(i) for i in self.ids]) + os.linesep)
+        os.replace(fname + '.tmp', fname)
+        
+    def append(self, _X):
+        
+        fId = 0
+        if len(self.ids) > 0:
+            fId = max(self.ids) + 1
+        try:
+            if not self.ut.saveData(self.primitivePath(fId), _X):
+                return False
+            self.ids.append(fId)
+            self.writeManifest()
+        except IOError:
+            print("IOError dataset \'{}\'".format(self.dir))
+            return False
+        return True
+    
+    def remove(self, _i):
+        
+        # the file is deleted once the manifest no longer lists it
+        try:
+            fId = self.ids.pop(_i)
+            self.writeManifest()
+        except (IOError, IndexError):
+            print("Error: the primitive {} could not be removed from \'{}\'".format(_i, self.dir))
+            return False
+        return self.ut.removeFile(self.primitivePath(fId))
+    
+    def move(self, _i, _j):
+        
+        try:
+            self.ids.insert(_j, self.ids.pop(_i))
+            self.writeManifest()
+        except (IOError, IndexError):
+            print("Error: the primitive {} could not be moved in \'{}\'".format(_i, self.dir))
+            return False
+        return True
+    
+    def isCompact(self):
+        
+        return self.ids == list(range(len(self.ids)))
+    
+    def compact(self):
+        
+        if self.isCompact():
+            return True
+        try:
+            # the moved files go through temporary names, so a file is never 
+            # renamed over one that still has to move
+            moved = [(i, fId) for i, fId in enumerate(self.ids) if not i == fId]
+            for i, fId in moved:
+                os.replace(self.primitivePath(fId), self.primitivePath(fId) + '.tmp')
+            for i, fId in moved:
+                os.replace(self.primitivePath(fId) + '.tmp', self.primitivePath(i))
+            self.ids = list(range(len(self.ids)))
+            self.writeManifest()
+        except OSError:
+            print("Error: the dataset \'{}\' could not be renumbered".format(self.dir))
+            return False
+        return True
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import os
+import struct
+import numpy as np
+
+class ExperimentData(dict):
+    
+    def __init__(self, _meta, _loaders):
+        
+        # the metadata is read upfront, every column is loaded the first time 
+        # it is accessed, so opening an experiment only costs its header; the
+        # columns not loaded yet are still keys of the experiment
+        dict.__init__(self, _meta)
+        self.loaders = _loaders
+        
+    def __missing__(self, _k):
+        
+        if not _k in self.loaders:
+            raise KeyError(_k)
+        v = self.loaders[_k]()
+        self[_k] = v
+        return v
+    
+    def __contains__(self, _k):
+        
+        return dict.__contains__(self, _k) or _k in self.loaders
+    
+    def get(self, _k, _default=None):
+        
+        if _k in self:
+            return self[_k]
+        return _default
+    
+    def keys(self):
+        
+        return list(dict.keys(self)) + [k for k in self.loaders.keys() if not dict.__contains__(self, k)]
+    
+    def __iter__(self):
+        
+        return iter(self.keys())
+    
+    def __len__(self):
+        
+        return len(self.keys())
+    
+    def values(self):
+        
+        return [self[k] for k in self.keys()]
+    
+    def items(self):
+        
+        return [(k, self[k]) for k in self.keys()]
+    
+    def columns(self):
+        
+        return list(self.loaders.keys())
+
+
+class ExperimentFile(object):
+    
+    """
+    Single file container of an experiment: the metadata header followed by
+    named columns.
+    
+    Each column is stored column-major (one contiguous block per state 
+    variable), so the slice of a layer or of a variable maps only its own 
+    pages. The columns are memory-mapped on demand and returned as 
+    (time, width) views.
+    """
+    
+    fileName = 'experiment.vce'
+    magic = b'VCEX'
+    version = 1
+    headerFormat = '<4sIQ'
+    alignment = 64
+    chunkBytes = 1 << 22
+    
+    def __init__(self, _fname):
+        
+        self.fname = _fname
+        self.meta = {}
+        self.layout = {}
+        self.maps = {}
+        hSize = struct.calcsize(self.headerFormat)
+        with open(_fname, 'rb') as f:
+            magic, version, nHead = struct.unpack(self.headerFormat, f.read(hSize))
+            if magic != self.magic or version != self.version:
+                raise IOError("unknown experiment file format")
+            head = f.read(nHead).decode('utf-8')
+        for line in head.split('\n'):
+            k, sep, v = line.partition('=')
+            if len(sep) == 0:
+                continue
+            if k == 'column':
+                name, dtype, rows, cols, offset = v.split(':')
+                self.layout[name] = (np.dtype(dtype), int(rows), int(cols), int(offset))
+            else:
+                self.meta[k] = v
+                
+    @staticmethod
+    def write(_fname, _meta, _columns):
+        
+        # offsets are written with a fixed width, so the header size is known 
+        # before the data positions are computed
+        lines = ['{}={}'.format(k, v) for k, v in _meta.items()]
+        columns = {}
+        for k, v in _columns.items():
+            v = np.asarray(v)
+            if len(v.shape) == 1:
+                v = v.reshape(-1, 1)
+            columns[k] = v
+        entries = ['column={}:{}:{}:{}:{{:016d}}'.format(k, v.dtype.name, v.shape[0], v.shape[1]) for k, v in columns.items()]
+        nHead = len('\n'.join(lines + [e.format(0) for e in entries]).encode('utf-8'))
+        
+        offset = struct.calcsize(ExperimentFile.headerFormat) + nHead
+        offsets = []
+        for k, v in columns.items():
+            offset = offset + (-offset) % ExperimentFile.alignment
+            offsets.append(offset)
+            offset = offset + v.nbytes
+        head = '\n'.join(lines + [e.format(o) for e, o in zip(entries, offsets)]).encode('utf-8')
+        
+        tmp = _fname + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(struct.pack(ExperimentFile.headerFormat, ExperimentFile.magic, ExperimentFile.version, len(head)))
+            f.write(head)
+            for (k, v), o in zip(columns.items(), offsets):
+                f.write(b'\0' * (o - f.tell()))
+                # column-major by blocks of columns, only one block is copied 
+                # at a time instead of the whole transposed matrix
+                step = max(1, ExperimentFile.chunkBytes // max(1, v.shape[0] * v.itemsize))
+                for c in range(0, v.shape[1], step):
+                    np.ascontiguousarray(v[:, c:c+step].T).tofile(f)
+        os.replace(tmp, _fname)
+        
+    def column(self, _name, _t0=0, _t1=None, _c0=0, _c1=None):
+        
+        # (time, width) view of the selected time range and state columns
+        if not _name in self.maps:
+            dtype, rows, cols, offset = self.layout[_name]
+            if rows * cols == 0:
+                self.maps[_name] = np.zeros((cols, rows), dtype=dtype)
+            else:
+                self.maps[_name] = np.memmap(self.fname, dtype=dtype, mode='r', offset=offset, shape=(cols, rows))
+        return self.maps[_name][_c0:_c1, _t0:_t1].T
+    
+    def open(self):
+        
+        loaders = {}
+        for k in self.layout.keys():
+            loaders[k] = (lambda _k=k: self.column(_k))
+        return ExperimentData(self.meta, loaders)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import os
+import numpy as np
+
+class MetricsLog(object):
+    
+    """
+    Binary log of the training metrics, next to the training.txt of libNRL.
+    
+    Every result of t_loop is appended as one record of 7 little-endian 
+    doubles: epoch, time (ms), RE_Q, RE_P, regulation, loss and saved. The 
+    file has no header, the history is read as a (records, 7) array and a 
+    record still being written is ignored. The history is a copy and no map
+    is kept open, a new training replaces the file instead of truncating it,
+    which Windows refuses for a mapped file.
+    
+    libNRL keeps writing training.txt, a training run outside the training 
+    tab or a restored model leaves the metrics behind the text log.
+    """
+    
+    fileName = 'metrics.bin'
+    dtype = np.dtype('<f8')
+    nColumns = 7
+    # seconds libNRL may still write to the text log after the last record
+    slack = 2.0
+    
+    def __init__(self, _modelDir):
+        
+        self.fname = _modelDir + os.sep + self.fileName
+        self.fd = None
+    
+    @staticmethod
+    def read(_modelDir):
+        
+        # the history, None when nothing has been logged
+        fname = _modelDir + os.sep + MetricsLog.fileName
+        try:
+            if not os.path.isfile(fname):
+                return None
+            n = os.path.getsize(fname) // (MetricsLog.nColumns * MetricsLog.dtype.itemsize)
+            if n == 0:
+                return None
+            return np.fromfile(fname, dtype=MetricsLog.dtype, count=n * MetricsLog.nColumns).reshape(n, MetricsLog.nColumns)
+        except (IOError, ValueError) as err:
+            print("Error: the training metrics \'{}\' could not be read ({})".format(fname, err))
+        return None
+    
+    @staticmethod
+    def isCurrent(_modelDir, _X, _logName, _log):
+        
+        # _X is the history read from the metrics, _log the rows of the text 
+        # log _logName; the metrics are behind when the text log was written 
+        # later or reaches a later epoch
+        if _log is None:
+            return True
+        try:
+            t = os.path.getmtime(_modelDir + os.sep + MetricsLog.fileName)
+            if os.path.getmtime(_logName) > t + MetricsLog.slack:
+                return False
+        except OSError:
+            return False
+        return _X[-1, 0] >= _log[-1, 0]
+        
+    def open(self, _append=True, _history=None):
+        
+        # _history (epoch, time, RE_Q, RE_P, regulation, loss) seeds a new 
+        # file, e.g. the text log of a model trained before the binary log
+        try:
+            if not _append or not os.path.isfile(self.fname):
+                tmp = '{}.{}.tmp'.format(self.fname, os.getpid())
+                with open(tmp, 'wb') as f:
+                    if not _history is None:
+                        X = np.zeros((_history.shape[0], self.nColumns), dtype=self.dtype)
+                        X[:, :_history.shape[1]] = _history
+                        f.write(X.tobytes())
+                os.replace(tmp, self.fname)
+            self.fd = open(self.fname, 'ab')
+            # a record left partial by a crash is dropped
+            size = self.fd.tell()
+            rSize = self.nColumns * self.dtype.itemsize
+            if size % rSize > 0:
+                self.fd.truncate(size - size % rSize)
+        except IOError as err:
+            print("Error: the training metrics \'{}\' could not be opened ({})".format(self.fname, err))
+            self.fd = None
+            return False
+        return True
+        
+    def append(self, _row):
+        
+        if self.fd is None:
+            return False
+        self.fd.write(np.asarray(_row, dtype=self.dtype).reshape(self.nColumns).tobytes())
+        self.fd.flush()
+        return True
+        
+    def close(self):
+        
+        if not self.fd is None:
+            self.fd.close()
+            self.fd = None
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import os
+from network.PVRNN import PVRNN
+
+class ModelCache(object):
+    
+    def __init__(self, _nrl):
+        
+        # the model loaded in the library is kept between resets, it is reloaded
+        # when the configuration or the parameter files change on disk, and 
+        # after a run that executed a postdiction step, which adapts the A 
+        # variables in memory
+        self.nrl = _nrl
+        self.key = None
+        self.parser = None
+        self.adapted = False
+        
+    def fingerprint(self, _configPath, _modelDir):
+        
+        st = os.stat(_configPath)
+        key = [(_configPath, st.st_mtime_ns, st.st_size)]
+        with os.scandir(_modelDir) as it:
+            for f in it:
+                if f.name.endswith('.d'):
+                    st = f.stat()
+                    key.append((f.name, st.st_mtime_ns, st.st_size))
+        return tuple(sorted(key))
+    
+    def invalidate(self):
+        
+        # to be called whenever the library is given another model, e.g. by the training
+        self.key = None
+        self.parser = None
+        self.adapted = False
+        
+    def adapt(self):
+        
+        # to be called by the control loop once a postdiction step has run; 
+        # libNRL has no entry point to restore the A variables alone, so the
+        # next load reloads the whole model
+        self.adapted = True
+        
+    def load(self, _configPath, _modelDir, _d, _z, _t, _delimiter):
+        
+        # returns the state parser of the model, loading the model only if needed
+        try:
+            key = self.fingerprint(_configPath, _modelDir)
+        except OSError:
+            key = None
+        if key is None or key != self.key or self.adapted:
+            self.nrl.newModel(_configPath.encode('ascii'))
+            self.nrl.load()
+            self.parser = PVRNN(_d, _z, _t, _delimiter)
+            self.key = key
+            self.adapted = False
+        self.nrl.setStateParser(self.parser)
+        return self.parser
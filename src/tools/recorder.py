@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+
+import os
+import queue
+import threading
+import numpy as np
+
+class BlockWriter(threading.Thread):
+    
+    def __init__(self, _files, _free):
+        
+        # writes the full blocks handed by the recorder and gives them back,
+        # so the control thread never waits for the disk
+        threading.Thread.__init__(self, daemon=True)
+        self.files = _files
+        self.free = _free
+        self.pending = queue.Queue()
+        self.error = None
+        
+    def run(self):
+        
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            block, n = item
+            try:
+                for k in self.files.keys():
+                    self.files[k].write(block[k][:n].tobytes())
+                    self.files[k].flush()
+                    os.fsync(self.files[k].fileno())
+            except OSError as err:
+                self.error = err
+            self.free.put(block)
+
+
+class ExperimentRecorder(object):
+    
+    def __init__(self, _blockSize=256, _nBlocks=3):
+        
+        self.nTimes = 0
+        self.n = 0
+        self.columns = {}
+        self.layout = {}
+        self.blockSize = _blockSize
+        self.nBlocks = _nBlocks
+        self.exDir = None
+        self.files = None
+        self.writer = None
+        self.block = None
+        self.i = 0
+        
+    def allocate(self, _nTimes, _stateSize, _nDof, _inMemory=True):
+        
+        # one row per time step, the whole experiment is allocated upfront 
+        # unless it is going to be streamed to disk
+        self.close()
+        self.exDir = None
+        self.nTimes = _nTimes
+        self.n = 0
+        self.layout = {'cur_pos': (_nDof, np.float32),
+                       'tgt_pos': (_nDof, np.float32),
+                       'hum_pos': (_nDof, np.float32),
+                       'hum_int': (1, bool),
+                       'states': (_stateSize, np.float32),
+                       'elbo': (3, np.float32)}
+        self.columns = {}
+        if _inMemory:
+            self.columns = self.allocateBlock(_nTimes)
+        
+    def allocateBlock(self, _n):
+        
+        c = {}
+        for k in self.layout.keys():
+            c[k] = np.zeros((_n, self.layout[k][0]), dtype=self.layout[k][1])
+        return c
+        
+    def getLayout(self):
+        
+        # 'name:dtype:width' entries, as stored in the experiment header
+        return ';'.join(['{}:{}:{}'.format(k, np.dtype(t).name, w) for k, (w, t) in self.layout.items()])
+        
+    def open(self, _exDir):
+        
+        # the rows are appended to one file per column in fixed size blocks, 
+        # so a long session keeps only a few blocks in memory and a crash loses
+        # at most the block being filled
+        self.columns = {}
+        self.exDir = _exDir
+        self.files = {}
+        for k in self.layout.keys():
+            self.files[k] = open(_exDir + '/{}.bin'.format(k), 'ab')
+        free = queue.Queue()
+        for b in range(self.nBlocks - 1):
+            free.put(self.allocateBlock(self.blockSize))
+        self.writer = BlockWriter(self.files, free)
+        self.writer.start()
+        self.block = self.allocateBlock(self.blockSize)
+        self.i = 0
+        
+    def isStreaming(self):
+        
+        return not self.writer is None
+        
+    def record(self, _session):
+        
+        if self.n >= self.nTimes:
+            print("Warning: the experiment recorder is full, the step {} was not recorded".format(self.n))
+            return False
+        
+        c = self.columns
+        i = self.n
+        if self.isStreaming():
+            c = self.block
+            i = self.i
+        c['cur_pos'][i] = _session.cur_pos
+        c['tgt_pos'][i] = _session.tgt_pos
+        c['hum_pos'][i] = _session.hum_pos
+        c['hum_int'][i] = _session.interaction
+        c['states'][i] = _session.state
+        c['elbo'][i] = _session.elbo
+        self.n = self.n + 1
+        
+        if self.isStreaming():
+            self.i = self.i + 1
+            if self.i == self.blockSize:
+                self.writer.pending.put((self.block, self.i))
+                # waits only if the writer is more than nBlocks-1 blocks behind
+                self.block = self.writer.free.get()
+                self.i = 0
+        return True
+    
+    def close(self):
+        
+        # returns False if some block could not be written
+        if not self.isStreaming():
+            return True
+        if self.i > 0:
+            self.writer.pending.put((self.block, self.i))
+        self.writer.pending.put(None)
+        self.writer.join()
+        for f in self.files.values():
+            f.close()
+        error = self.writer.error
+        self.writer = None
+        self.files = None
+        self.block = None
+        self.i = 0
+        if not error is None:
+            print("Error: the experiment stream could not be written ({})".format(error))
+            return False
+        return True
+        
+    def getColumns(self):
+        
+        # views over the filled prefix, nothing is copied
+        c = {}
+        for k in self.columns.keys():
+            c[k] = self.columns[k][:self.n]
+        return c
+    
+    def __len__(self):
+        
+        return self.n
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+
+
+import numpy as np
+from tools.modelcache import ModelCache
+from tools.session import ExperimentSession
+from tools.recorder import ExperimentRecorder
+
+class HeadlessRunner(object):
+    
+    def __init__(self, _nrl, _ut, _modelConfigDir, _datasetDir, _experimentDir):
+        
+        self.nrl = _nrl
+        self.ut = _ut
+        self.modelConfigDir = _modelConfigDir
+        self.datasetDir = _datasetDir
+        self.experimentDir = _experimentDir
+        self.delimiter = self.ut.delimiter
+        self.motionSaturation = 5
+        self.modelCache = ModelCache(self.nrl)
+        self.session = ExperimentSession(self.nrl, self.motionSaturation, self.modelCache)
+        self.recorder = ExperimentRecorder()
+        
+    def paramsFactory(self):
+        
+        # same defaults as the Experiment tab
+        p = {}
+        p['model'] = ''
+        p['primitiveid'] = 1
+        p['windowSize'] = 5
+        p['w'] = None
+        p['postdiction'] = True
+        p['epochs'] = 15
+        p['alpha'] = 0.3
+        p['beta1'] = 0.1
+        p['beta2'] = 0.95
+        p['motorcompliance'] = 0.9
+        p['numbertimes'] = 2000
+        return p
+    
+    def parseHuman(self, _fname):
+        
+        # one row per time step: x, y and optionally an interaction flag
+        X = self.ut.readData(_fname, _delimiter=self.delimiter)
+        if X is None or len(X.shape) < 2 or X.shape[1] < 2:
+            print("Error: the human trajectory \'{}\' should have at least two columns".format(_fname))
+            return None
+        H = np.ones((X.shape[0], 3), dtype=np.float32)
+        H[:,:X.shape[1]] = X[:,:3]
+        return H
+        
+    def parseModelDataset(self, _mName):
+        
+        mName = _mName
+        mPath = self.ut.modelPathString(self.modelConfigDir, mName)
+        m = self.ut.parseModel(mPath)
+        if m is None:
+            print("Error: the model \'{}\' could not be parsed".format(mName))
+            return None
+        if not m['train']:
+            print("Error: the model \'{}\' has not been trained".format(mName))
+            return None
+        d = self.ut.parseDataset(self.datasetDir + '/' + m['dsname'])
+        if d is None:
+            print("Error: the dataset of the model \'{}\' could not be parsed".format(mName))
+            return None
+        return m, d
+    
+    def prepareDataset(self, _mName):
+        
+        # renumbers the primitive files read by libNRL; to be called once by 
+        # the parent process before the runs, which only read the dataset
+        md = self.parseModelDataset(_mName)
+        if md is None:
+            return False
+        return self.ut.getDatasetStore(self.datasetDir, md[1]).compact()
+    
+    def loadModel(self, _mName):
+        
+        md = self.parseModelDataset(_mName)
+        if md is None:
+            return None
+        m, d = md
+        if not self.ut.getDatasetStore(self.datasetDir, d).isCompact():
+            print("Error: the dataset of the model \'{}\' is not compacted".format(_mName))
+            return None
+        
+        mPath = self.ut.modelPathString(self.modelConfigDir, _mName)
+        self.modelCache.load(self.ut.pwd + '/' + mPath, m['modelpath'], self.ut.trimString(m['d']), self.ut.trimString(m['z']), self.ut.trimString(m['t']), self.delimiter)
+        return m, d
+    
+    def rollout(self, _mName, _pIds=None, _nTimes=None):
+        
+        # every primitive of the dataset over its recorded length by default,
+        # returns the outputs and states as (batch, time, dim) arrays
+        md = self.loadModel(_mName)
+        if md is None:
+            return None, None
+        m, d = md
+        pIds = _pIds
+        if pIds is None:
+            pIds = list(range(int(d['numberprims'])))
+        nTimes = _nTimes
+        if nTimes is None:
+            nTimes = int(d['numbertimes'])
+        return self.nrl.generateBatch(pIds, nTimes)
+        
+    def run(self, _params, _human=None, _save=True):
+        
+        p = _params
+        mName = p['model']
+        md = self.loadModel(mName)
+        if md is None:
+            return None
+        m, d = md
+        
+        w = p['w']
+        if w is None:
+            w = [1.0e-5] * m['nlayers']
+        nTimes = p['numbertimes']
+        
+        self.session.reset(p['windowSize'], p['postdiction'])
+        self.recorder.allocate(nTimes, self.session.stateBufferSize, self.session.nDof)
+        self.nrl.e_enable(p['primitiveid'] - 1,
+                          p['windowSize'],
+                          np.array(w, dtype=np.float32),
+                          nTimes,
+                          p['epochs'],
+                          p['alpha'],
+                          p['beta1'],
+                          p['beta2'], False, False)
+        
+        mc = p['motorcompliance']
+        nHuman = 0
+        if not _human is None:
+            nHuman = _human.shape[0]
+        
+        # the same merge, saturation and postdiction steps as the Experiment tab,
+        # without any pacing
+        for t in range(nTimes):
+            if t < nHuman and _human[t,2] != 0:
+                self.session.doStep(_human[t,:2], True, mc)
+            else:
+                self.session.doStep(self.session.hum_pos, False, mc)
+            self.recorder.record(self.session)
+            
+        e = {}
+        e['model'] = mName
+        e['dataset'] = d['name']
+        e['numbertimes'] = '{}'.format(len(self.recorder))
+        e['samplingperiod'] = '{}'.format(d['samplingperiod'])
+        e['primitiveid'] = '{}'.format(p['primitiveid'])
+        e['windowSize'] = '{}'.format(p['windowSize'])
+        e['w'] = self.delimiter.join(['{}'.format(v) for v in w])
+        e['postdiction'] = '{}'.format(p['postdiction'])
+        e['epochs'] = '{}'.format(p['epochs'])
+        e['alpha'] = '{}'.format(p['alpha'])
+        e['beta1'] = '{}'.format(p['beta1'])
+        e['beta2'] = '{}'.format(p['beta2'])
+        e['motorcompliance'] = '{}'.format(mc)
+        e.update(self.recorder.getColumns())
+        
+        if _save:
+            if not self.ut.saveExperiment(self.experimentDir + '/' + mName, e):
+                print("Error: the experiment was not saved!")
+                return None
+        return e
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+
+import numpy as np
+
+class Trail(object):
+    
+    def __init__(self, _size, _dim):
+        
+        # every point is written twice, so the last '_size' points are always 
+        # available as a contiguous view without copying
+        self.size = _size
+        self.buffer = np.zeros((2*_size, _dim), dtype=np.float32)
+        self.i = 0
+        self.count = 0
+        
+    def clear(self):
+        
+        self.i = 0
+        self.count = 0
+        
+    def append(self, _x):
+        
+        self.buffer[self.i] = _x
+        self.buffer[self.i + self.size] = _x
+        self.i = (self.i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        
+    def view(self):
+        
+        start = (self.i - self.count) % self.size
+        return self.buffer[start:start+self.count]
+    
+    def __len__(self):
+        
+        return self.count
+
+
+class ExperimentSession(object):
+    
+    def __init__(self, _nrl, _motionSaturation=5, _modelCache=None):
+        
+        self.nrl = _nrl
+        self.modelCache = _modelCache
+        self.motionSaturation = _motionSaturation
+        self.nDof = 0
+        self.stateBufferSize = 0
+        self.windowSize = 0
+        self.ERStartTime = 0
+        self.step = 0        
+        
+    def reset(self, _windowSize, _postdiction=True, _showERLog=False):
+        
+        # the buffers are allocated once per session and reused at every step
+        self.nDof = self.nrl.getNDof()
+        self.stateBufferSize = self.nrl.getStateBufferSize()
+        self.windowSize = _windowSize
+        self.ERStartTime = self.windowSize -1
+        self.postdiction = _postdiction
+        self.showERLog = _showERLog
+        self.step = 0
+        
+        self.tgt_pos = np.zeros((self.nDof,), dtype=np.float32)
+        self.cur_pos = np.zeros((self.nDof,), dtype=np.float32)
+        self.hum_pos = np.zeros((self.nDof,), dtype=np.float32)
+        self.new_pos = np.zeros((self.nDof,), dtype=np.float32)
+        self.delta = np.zeros((self.nDof,), dtype=np.float32)
+        self.elbo = np.zeros((3,), dtype=np.float32)
+        self.pos_win = np.zeros((self.windowSize, self.nDof), dtype=np.float32)
+        self.pos_win_1d = self.pos_win.reshape(-1)
+        self.state = np.zeros((self.stateBufferSize,), dtype=np.float32)
+        self.interaction = False
+        
+    def doStep(self, _hXY, _interaction, _mc):
+        
+        # generate the robot intention        
+        self.nrl.e_generate(self.tgt_pos)
+        
+        # merge robot and human intention
+        if _interaction:
+            self.hum_pos[:] = _hXY
+            np.multiply(self.hum_pos, _mc, out=self.new_pos)
+            self.new_pos += (1.0 - _mc)*self.tgt_pos
+        else:
+            self.new_pos[:] = self.tgt_pos
+        self.interaction = _interaction
+        
+        np.subtract(self.new_pos, self.cur_pos, out=self.delta)
+        np.clip(self.delta, -self.motionSaturation, self.motionSaturation, out=self.delta)
+        self.cur_pos += self.delta
+        
+        # sliding postdiction window, the oldest position is dropped
+        self.pos_win[:-1] = self.pos_win[1:]
+        self.pos_win[-1] = self.cur_pos
+        
+        self.elbo[:] = 0.0
+        if self.postdiction and self.step >= self.ERStartTime:
+            self.nrl.e_postdict(self.pos_win_1d, self.elbo, self.showERLog)
+            if self.step == self.ERStartTime and not self.modelCache is None:
+                self.modelCache.adapt()
+            
+        self.nrl.e_getState(self.state)
+        self.step = self.step + 1
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import numpy as np
+
+class ExperimentStatistics(object):
+    
+    def __init__(self, _d, _z):
+        
+        self.d = _d
+        self.z = _z
+        self.labels = ['d', 'h', 'μ', 'log σ', 'σ', 'ε', 'z', 'd', 'h', 'μ', 'log σ', 'σ', 'ε','z']
+        self.elboLabels = ['ELBO', 'Reconstruction', 'Regulation']
+        self.dtype = np.dtype([('context', 'U12'),
+                               ('variable', 'U16'),
+                               ('neuron', 'i4'),
+                               ('dist', 'U10'),
+                               ('sum', 'f8'),
+                               ('mean', 'f8'),
+                               ('stdev', 'f8')])
+        
+    def reduce(self, _X):
+        
+        # sum, mean and sample standard deviation of every column in one pass 
+        # each, accumulated in float64 whatever the stored type
+        X = np.asarray(_X)
+        n = X.shape[0]
+        s = np.sum(X, axis=0, dtype=np.float64)
+        mean = s / n if n > 0 else np.full(s.shape, np.nan)
+        stdev = np.full(s.shape, np.nan)
+        if n > 1:
+            stdev = np.std(X, axis=0, ddof=1, dtype=np.float64)
+        return s, mean, stdev
+        
+    def compute(self, _states, _elbo):
+        
+        # one row per ELBO term and per state neuron, in the order of the state vector
+        rows = []
+        s, mean, stdev = self.reduce(_elbo)
+        for i, k in enumerate(self.elboLabels):
+            rows.append(('Global', k, 0, '', s[i], mean[i], stdev[i]))
+        
+        s, mean, stdev = self.reduce(_states)
+        j = 0
+        for l in range(len(self.d)):
+            sizes = [self.d[l], self.d[l]] + [self.z[l]] * 5 + [self.d[l], self.d[l]] + [self.z[l]] * 5
+            for k, n in enumerate(sizes):
+                dist = 'Prior'
+                if k >= 7:
+                    dist = 'Posterior'
+                for i in range(n):
+                    rows.append(('Layer #{}'.format(l+1), self.labels[k], i + 1, dist, s[j], mean[j], stdev[j]))
+                    j = j + 1
+        return np.array(rows, dtype=self.dtype)
+    
+    def render(self, _table, _time):
+        
+        sep = '------------------------------------------------------------------------------------'
+        header = '{:<12}{:<15}{:<12}{:<12}{:<12}{:<12}{:<12}'
+        row = '{:<12}{:<15}{:<12}{:<12}{:<12,.3f}{:<12,.3f}{:<12,.3f}'
+        lines = ['Experiment Results',
+                 '====================',
+                 header.format('Context','Variable', 'Neuron', 'Dist.','Sum','Mean','stdev'),
+                 sep,
+                 header.format('Global','Time(s)','', '',_time,'','')]
+        context = 'Global'
+        for r in _table:
+            if r['context'] != context:
+                lines.append(sep)
+                context = r['context']
+            neuron = r['neuron'] if r['neuron'] > 0 else ''
+            lines.append(row.format(r['context'], r['variable'], neuron, r['dist'], r['sum'], r['mean'], r['stdev']))
+        lines.append('====================')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ BSD 3-Clause License
+
+  Copyright (c) 2020 Okinawa Institute of Science and Technology (OIST).
+  All rights reserved.
+
+  Redistribution and use in source and binary forms, with or without
+  modification, are permitted provided that the following conditions
+  are met:
+
+   * Redistributions of source code must retain the above copyright
+     notice, this list of conditions and the following disclaimer.
+   * Redistributions in binary form must reproduce the above
+     copyright notice, this list of conditions and the following
+     disclaimer in the documentation and/or other materials provided
+     with the distribution.
+   * Neither the name of Willow Garage, Inc. nor the names of its
+     contributors may be used to endorse or promote products derived
+     from this software without specific prior written permission.
+
+  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+  "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+  LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+  FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+  COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+  INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+  BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+  LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+  CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+  LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+  ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+  POSSIBILITY OF SUCH DAMAGE.
+
+ Author: Hendry F. Chame <hendryfchame@gmail.com>
+
+ Publication:
+
+   Chame, H. F., Ahmadi, A., & Tani, J. (2020).
+   A hybrid human-neurorobotics approach to primary intersubjectivity via
+   active inference. Frontiers in psychology, 11.
+
+   Okinawa Institute of Science and Technology Graduate University (OIST)
+   Cognitive Neurorobotics Research Unit (CNRU)
+   1919-1, Tancha, Onna, Kunigami District, Okinawa 904-0495, Japan
+
+"""
+
+import os
+import re
+import threading
+import numpy as np
+
+class TrainingLog(object):
+    
+    """
+    Incremental reader of the training.txt file written by libNRL.
+    
+    The byte offset of the last complete line read and the parsed rows are
+    kept, a read only parses the lines appended since, all at once with a 
+    pattern compiled for the class. The rows are 'epoch, time (ms), RE_Q, 
+    RE_P, regulation, loss'. A file that shrinks or whose bytes before the 
+    offset changed has been rewritten by a new training and is read again 
+    from the start.
+    """
+    
+    pattern = re.compile(r'^Epoch \[([^\]]*)\] - Time \[([^\]]*)ms\] - RE_Q \[([^\]]*)\] - RE_P \[([^\]]*)\] - Regulation \[([^\]]*)\] - loss \[([^\]]*)\][ \t\r]*$', re.M)
+    nColumns = 6
+    
+    def __init__(self, _fname):
+        
+        self.fname = _fname
+        self.lock = threading.Lock()
+        self.reset()
+        
+    def reset(self):
+        
+        self.offset = 0
+        self.tail = b''
+        self.buffer = np.zeros((0, self.nColumns))
+        self.n = 0
+        
+    def __len__(self):
+        
+        return self.n
+        
+    def append(self, _rows):
+        
+        # the buffer doubles when full, so appending is amortized O(new rows)
+        n = self.n + _rows.shape[0]
+        if n > self.buffer.shape[0]:
+            buffer = np.zeros((max(n, 2 * self.buffer.shape[0], 1024), self.nColumns))
+            buffer[:self.n] = self.buffer[:self.n]
+            self.buffer = buffer
+        self.buffer[self.n:n] = _rows
+        self.n = n
+    
+    def parse(self, _text):
+        
+        matches = self.pattern.findall(_text)
+        try:
+            return np.array(matches, dtype=np.float64).reshape(-1, self.nColumns)
+        except ValueError:
+            # a malformed number, the rows are converted one by one to skip it
+            rows = []
+            for m in matches:
+                try:
+                    rows.append([float(v) for v in m])
+                except ValueError:
+                    pass
+            return np.array(rows, dtype=np.float64).reshape(-1, self.nColumns)
+        
+    def read(self):
+        
+        # a copy of the rows read so far, None when the file has no epoch line;
+        # the lock serializes the readers of the Tk and training threads
+        with self.lock:
+            X = self.readLocked()
+            if X is None:
+                return None
+            return X.copy()
+        
+    def readLocked(self):
+        
+        try:
+            with open(self.fname, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < self.offset:
+                    self.reset()
+                f.seek(self.offset - len(self.tail))
+                if not f.read(len(self.tail)) == self.tail:
+                    self.reset()
+                f.seek(self.offset)
+                chunk = f.read(size - self.offset)
+        except IOError:
+            print("IOError file \'{}\'".format(self.fname))
+            return None
+        
+        # a line still being written is left for the next read
+        end = chunk.rfind(b'\n') + 1
+        if end > 0:
+            self.append(self.parse(chunk[:end].decode('utf-8', 'replace')))
+            self.offset = self.offset + end
+            self.tail = (self.tail + chunk[:end])[-64:]
+        
+        if self.n == 0:
+            return None
+        return self.buffer[:self.n]
@@ -49,22 +49,106 @@
 
 
 import os
+import csv
 import time
 import shutil
+import threading
+from collections import OrderedDict
 import numpy as np
 from datetime import datetime
-import csv 
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 import pandas as pd
 
 import parse
+from tools.experimentfile import ExperimentFile, ExperimentData
+from tools.catalog import ExperimentCatalog
+from tools.datasetstore import DatasetStore
+from tools.datasetpack import DatasetPack
+from tools.traininglog import TrainingLog
+from tools.metricslog import MetricsLog
+import sqlite3
+
+class ParseCache(object):
+    
+    """
+    LRU cache of the parsed models and datasets.
+    
+    An entry keeps the (mtime, size) signature of every file it was parsed 
+    from and is used only while they all match, so a file changed by another 
+    process or by libNRL is parsed again. The saves and removals of Utils 
+    invalidate their paths explicitly. The values are copied on the way out, 
+    the tabs edit the dictionaries they get.
+    """
+    
+    def __init__(self, _maxSize=64):
+        
+        self.maxSize = _maxSize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        
+    @staticmethod
+    def signature(_path):
+        
+        try:
+            st = os.stat(_path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+        
+    @staticmethod
+    def key(_kind, _path):
+        
+        return (_kind, os.path.abspath(_path))
+        
+    def get(self, _kind, _path):
+        
+        k = self.key(_kind, _path)
+        with self.lock:
+            entry = self.entries.get(k)
+            if entry is None:
+                return None
+            value, deps = entry
+            for path, sig in deps:
+                if not self.signature(path) == sig:
+                    del self.entries[k]
+                    return None
+            self.entries.move_to_end(k)
+            return value
+        
+    def put(self, _kind, _path, _value, _deps):
+        
+        # the signatures are taken after the parse, a file changed meanwhile 
+        # only causes one more parse
+        deps = [(p, self.signature(p)) for p in _deps]
+        k = self.key(_kind, _path)
+        with self.lock:
+            self.entries[k] = (_value, deps)
+            self.entries.move_to_end(k)
+            while len(self.entries) > self.maxSize:
+                self.entries.popitem(last=False)
+        
+    def invalidate(self, _path):
+        
+        # the entries of the path and of everything below it
+        path = os.path.abspath(_path)
+        with self.lock:
+            for k in list(self.entries.keys()):
+                if k[1] == path or k[1].startswith(path + os.sep):
+                    del self.entries[k]
+                    
+    def clear(self):
+        
+        with self.lock:
+            self.entries.clear()
 
 class Utils():
     
     def __init__(self, _pwd):
         
         self.pwd = _pwd
+        self.cache = ParseCache()
+        self.trainingLogs = {}
         self.modelFilePrefix = "properties_"
         self.trainingFileName = 'training.txt'
         self.modelFileSufix = ".d"
@@ -73,6 +157,9 @@ class Utils():
         self.primFilePrefix = "primitive_"
         self.primFileSufix = ".csv"
         self.delimiter = ','
+        # formats of saveData by dtype kind, the significant digits round-trip
+        # single and double precision values exactly
+        self.dataFormats = {'b': '%s', 'i': '%d', 'u': '%d', 'f4': '%.9g', 'f8': '%.17g'}
         
         self.modelKeys = ['datapath',\
                               'modelpath',
@@ -114,6 +201,25 @@ class Utils():
                               'beta2',
                               'motorcompliance']
 
+        # optional timing statistics of the control loop, in ms
+        self.experimentTimingKeys = ['ticks',\
+                              'missedticks',
+                              'periodmean',
+                              'periodstdev',
+                              'latenessmean',
+                              'latenessmax',
+                              'computemean',
+                              'computemax',
+                              'rendermean',
+                              'rendermax',
+                              'histedges',
+                              'latenesshist',
+                              'computehist',
+                              'renderhist']
+
+        # optional layout of the streamed columns, name:dtype:width separated by ';'
+        self.experimentStreamKeys = ['layout']
+
         self.experimentExportKeys = ['cur_pos',\
                               'tgt_pos',
                               'hum_pos',
@@ -141,8 +247,22 @@ class Utils():
         return pcsArrayZ
 
 
-    def pcaFromDatabase(self,_Xs, _XdbPath, _nComp=2):
+    def pcaSource(self, _path):
+        
+        # an experiment folder or a legacy .npy states file, mapped not loaded
+        if self.isDir(_path):
+            e = self.parseExperiment(_path)
+            if e is None:
+                raise IOError("the experiment \'{}\' could not be parsed".format(_path))
+            return e['states']
+        return np.load(_path, mmap_mode='r')
+
+    def pcaFromDatabase(self,_Xs, _XdbPath, _nComp=2, _chunkSize=4096):
         
+        # exact PCA of the standardized states, the mean and the scatter 
+        # matrix are merged chunk by chunk (Chan et al.) so that the memory 
+        # does not grow with the number of steps in the database; returns the
+        # projections of the arrays of _Xs followed by one per database entry
         sizeBuffer = []
         v_list = []
         for x in _Xs:
@@ -150,59 +270,74 @@ class Utils():
             v_list.append(x)        
         
         for p in _XdbPath:                
-            v = np.load(p)
+            v = self.pcaSource(p)
             sizeBuffer.append(v.shape)
             v_list.append(v);
                             
         nComp = _nComp
-        lColumns = []
-        for c in range(1, nComp+1):
-            lColumns.append("PC{}".format(c))        
-        
-        VZ = np.vstack(v_list)   
-        
-        AllHidden_std = StandardScaler().fit_transform(VZ)
-        pca = PCA(n_components=nComp)
-        pcaAnalysis = pca.fit_transform(AllHidden_std)
-        principalDf = pd.DataFrame(data = pcaAnalysis, columns = lColumns)
-        pcs = principalDf.loc[:,lColumns];
-        pcsArrayZ = np.array(pcs);
+        n = 0
+        mean = None
+        M2 = None
+        for v in v_list:
+            for t in range(0, v.shape[0], _chunkSize):
+                c = np.asarray(v[t:t+_chunkSize], dtype=np.float64)
+                nB = c.shape[0]
+                meanB = c.mean(axis=0)
+                cB = c - meanB
+                if mean is None:
+                    n, mean, M2 = nB, meanB, cB.T @ cB
+                    continue
+                delta = meanB - mean
+                M2 += cB.T @ cB + np.outer(delta, delta) * (n * nB / (n + nB))
+                mean = mean + delta * (nB / (n + nB))
+                n = n + nB
+        
+        # the covariance of the standardized data is the correlation matrix, 
+        # constant columns keep a unit scale as in StandardScaler
+        scale = np.sqrt(np.diag(M2) / n)
+        scale[scale == 0.0] = 1.0
+        C = M2 / n / np.outer(scale, scale)
+        eigVal, eigVec = np.linalg.eigh(C)
+        V = eigVec[:, ::-1][:, :nComp]
+        # the largest loading of every component is positive, as in sklearn
+        signs = np.sign(V[np.argmax(np.abs(V), axis=0), range(nComp)])
+        V = V * signs
         
         X = []
-        idx = 0
-        for i in range(len(_Xs)):
-            X.append(pcsArrayZ[idx:sizeBuffer[i][0],:])
-            idx += sizeBuffer[i][0]
+        for v in v_list:
+            P = np.zeros((v.shape[0], nComp))
+            for t in range(0, v.shape[0], _chunkSize):
+                P[t:t+_chunkSize] = ((np.asarray(v[t:t+_chunkSize], dtype=np.float64) - mean) / scale) @ V
+            X.append(P)
     
         return X, sizeBuffer
 
 
     def parseTrainingData(self,_fname):
       
+        # one incremental reader per log, a refresh only parses the appended lines
         fname = _fname +  '/' + self.trainingFileName        
         if not self.fileExists(fname):
             return None
         
-        list_train_data = []    
-        try:
-            format_string = 'Epoch [{}] - Time [{}ms] - RE_Q [{}] - RE_P [{}] - Regulation [{}] - loss [{}]'
-            with open(fname) as f:             
-                for line in f:                 
-                    parsed = parse.parse(format_string, line)                
-                    if not parsed == None:
-                        l_par = []
-                        for i in range (6):
-                            l_par.append(float(parsed[i]))                                        
-                        list_train_data.append(np.array(l_par))
-        except IOError:
-            print("IOError file \'{}\'".format(_fname))        
-            
-        if len(list_train_data) > 0 :
-            return np.vstack(list_train_data)
-    
-        return None
+        key = os.path.abspath(fname)
+        if not key in self.trainingLogs:
+            self.trainingLogs[key] = TrainingLog(fname)
+        return self.trainingLogs[key].read()
     
         
+    def getTrainingHistory(self, _modelDir):
+        
+        # the binary metrics of the training tab when present and up to date,
+        # the text log of libNRL otherwise
+        if len(_modelDir) == 0:
+            return None
+        X = MetricsLog.read(_modelDir)
+        log = self.parseTrainingData(_modelDir)
+        if X is None or not MetricsLog.isCurrent(_modelDir, X, _modelDir + '/' + self.trainingFileName, log):
+            return log
+        return X
+        
     def trimString(self, _str, _sep=' '):
         
         str_strip = _str.strip().split(_sep)
@@ -230,7 +365,6 @@ class Utils():
         return mList
     
     def parseModel(self,_fname):        
-        m = self.modelFactory()    
         li = 0 
         
         fullName = self.pwd + '/' + _fname
@@ -238,6 +372,11 @@ class Utils():
             print('The model \'{}\' no longer exists !'.format(_fname.split('/')[-1]))
             return None
         
+        m = self.cache.get('model', _fname)
+        if not m is None:
+            return dict(m)
+        m = self.modelFactory()    
+        
         try:        
             with open(_fname) as f:             
                 for line in f:                    
@@ -256,6 +395,7 @@ class Utils():
                 m['nlayers'] =  len(m['d'].split(self.delimiter))  
                 prevTrain = self.parseTrainingData(m['modelpath'])
                 m['train'] = not prevTrain is None
+                self.cache.put('model', _fname, dict(m), [_fname, m['modelpath'] + '/' + self.trainingFileName])
                               
         except IOError:
             print("IOError file \'{}\'".format(_fname))        
@@ -267,6 +407,19 @@ class Utils():
                 
         return m
     
+    def installModel(self, _modelConfigDir, _modelDataDir, _datasetDir, _mName):
+        
+        # the model and dataset paths are stored as absolute paths of this installation
+        absBasePath = os.path.abspath(".")
+        mFileName = self.modelPathString(_modelConfigDir, _mName)
+        m = self.parseModel(mFileName)
+        if m is None:
+            return False
+        m['modelpath'] = absBasePath + os.sep + _modelDataDir.replace('/',os.sep) + os.sep + _mName
+        m['datapath'] = absBasePath + os.sep + _datasetDir.replace('/',os.sep) + os.sep + m['dsname']    
+        
+        return self.saveModel(mFileName, m, False)
+    
     def getCurrentTimeMS(self):
         
         return int(round(time.time() * 1000))
@@ -311,6 +464,7 @@ class Utils():
         for k in self.modelKeys:
             data = data + k + '=' + _m[k] + os.linesep
                               
+        self.cache.invalidate(_fname)
         try:        
             f = open(_fname,"w") 
             f.write(data)
@@ -359,6 +513,10 @@ class Utils():
             print('The dataset \'{}\' no longer exists !'.format(_fname.split('/')[-1]))
             return None
             
+        cached = self.cache.get('dataset', _fname)
+        if not cached is None:
+            return self.copyDataset(cached)
+        
         try:        
             with open(fname) as f:             
                 for line in f:                    
@@ -373,12 +531,10 @@ class Utils():
                 d = None
             else:                
                 d['name'] =  _fname.split('/')[-1]                
-                pList = []
-                for i in range(int(d['numberprims'])):
-                    pfname = '{}/{}{}_0{}'.format(_fname, self.primFilePrefix, i, self.primFileSufix)
-                    vDat = self.readData(pfname, _delimiter=self.delimiter)
-                    pList.append(vDat)
-                d['data'] = pList
+                # the primitives in the order of the manifest
+                d['data'] = DatasetStore(self, _fname, d).load()
+                deps = [_fname, fname, _fname + '/' + DatasetStore.manifestFileName, _fname + '/' + DatasetPack.fileName]
+                self.cache.put('dataset', _fname, self.copyDataset(d), deps)
                                         
         except IOError:
             print("IOError file \'{}\'".format(fname))        
@@ -389,34 +545,50 @@ class Utils():
             
         return d
 
+    def copyDataset(self, _d):
+        
+        # the primitives of a pack are read-only views and are shared
+        d = dict(_d)
+        if isinstance(d['data'], list):
+            d['data'] = list(d['data'])
+        return d
 
     def datasetPathString(self,_bDir, _cName):
         
         return _bDir + '/' + self.datasetFilePrefix +  _cName + self.datasetFileSufix
 
         
+    def saveDatasetHeader(self, _dsDir, _d):
+        
+        self.cache.invalidate(_dsDir)
+        data = ''         
+        for k in self.datasetKeys:
+            data = data + k + '=' + _d[k] + os.linesep
+        fName = _dsDir + '/' + self.datasetFileName
+        f = open(fName + '.tmp',"w") 
+        f.write(data)
+        f.close()            
+        os.replace(fName + '.tmp', fName)
+        
     def saveDataset(self,_dir, _d):
         
+        # writes the whole dataset, the edition of the primitives goes
+        # through a DatasetStore that only touches the affected files
         flag = True
         dsName = _d['name']
         dsDir = _dir + '/' + dsName
+        self.cache.invalidate(dsDir)
         if not self.isDir('./'+dsDir):
             flag = self.createDir(dsDir)        
         else:
             #clear previous files
             for f in os.listdir(dsDir):
-                self.removeFile(f)
+                self.removeFile(dsDir + '/' + f)
                 
-        data = ''         
-        
-        for k in self.datasetKeys:
-            data = data + k + '=' + _d[k] + os.linesep
         try:        
-            fName = dsDir + '/' + self.datasetFileName
-            f = open(fName,"w") 
-            f.write(data)
-            f.close()            
             dList = _d['data']                 
+            _d['numberprims'] = '{}'.format(len(dList))
+            self.saveDatasetHeader(dsDir, _d)
             
             for i in range(len(dList)):        
                 pName = '{}/{}{}_0{}'.format(dsDir, self.primFilePrefix, i, self.primFileSufix)                
@@ -428,31 +600,48 @@ class Utils():
         
         return flag
     
+    def getDatasetStore(self, _dir, _d):
+        
+        return DatasetStore(self, _dir + '/' + _d['name'], _d)
+    
+    def experimentMeta(self, _e):
+        
+        # mandatory keys first, then the optional ones present in the experiment
+        meta = {}
+        for k in self.experimentKeys:
+            meta[k] = _e[k]
+        for k in self.experimentTimingKeys + self.experimentStreamKeys:
+            if k in _e:
+                meta[k] = _e[k]
+        return meta
+        
+    def writeExperimentHeader(self, _exDir, _e, _partial=False):
+        
+        data = ''         
+        for k, v in self.experimentMeta(_e).items():
+            data = data + k + '=' + v + os.linesep
+        if _partial:
+            data = data + 'partial=True' + os.linesep
+        
+        # written aside and renamed, a crash leaves either the old or the new header
+        fName = _exDir + '/' + self.experimentFileName
+        f = open(fName + '.tmp',"w") 
+        f.write(data)
+        f.close()            
+        os.replace(fName + '.tmp', fName)
+        
     def saveExperiment(self,_dir, _e):
         
         flag = True
         exDir = ''
         try:        
             now = datetime.now()        
-            dt_string = now.strftime("date[%Y_%m_%d]_time[%H_%M_%S]")            
-            exDir = _dir + '/' + dt_string
-            if self.createDir(exDir):
-                data = ''         
+            dt_string = self.createUniqueDir(_dir, now.strftime("date[%Y_%m_%d]_time[%H_%M_%S]"))
+            if not dt_string is None:
+                exDir = _dir + '/' + dt_string
                 _e['datetime']=dt_string        
-                for k in self.experimentKeys:
-                    data = data + k + '=' + _e[k] + os.linesep
-                
-                fName = exDir + '/' + self.experimentFileName
-                f = open(fName,"w") 
-                f.write(data)
-                f.close()            
-                
-                np.save(exDir + '/cur_pos.npy', _e['cur_pos'])
-                np.save(exDir + '/tgt_pos.npy', _e['tgt_pos'])
-                np.save(exDir + '/hum_pos.npy', _e['hum_pos'])
-                np.save(exDir + '/hum_int.npy', _e['hum_int'])
-                np.save(exDir + '/states.npy', _e['states'])
-                np.save(exDir + '/elbo.npy', _e['elbo'])
+                self.saveExperimentFile(exDir, _e)
+                self.catalogExperiment(exDir, _e)
             else:
                 flag = False
         except IOError:
@@ -461,36 +650,148 @@ class Utils():
             flag = False
     
         return flag
-
+    
+    def beginExperiment(self, _dir, _e):
+        
+        # the folder of a streamed experiment is created when it starts, the 
+        # header is marked as partial until endExperiment is called
+        exDir = None
+        try:        
+            now = datetime.now()        
+            dt_string = self.createUniqueDir(_dir, now.strftime("date[%Y_%m_%d]_time[%H_%M_%S]"))
+            if not dt_string is None:
+                exDir = _dir + '/' + dt_string
+                _e['datetime']=dt_string        
+                self.writeExperimentHeader(exDir, _e, True)
+        except IOError:
+            print("IOError file \'{}\'".format(exDir))            
+            if not exDir is None:
+                self.removeDir(exDir)
+            exDir = None
+        return exDir
+    
+    def endExperiment(self, _exDir, _e):
+        
+        # the streamed columns are packed into the container, the stream files
+        # are removed only once the container is complete
+        flag = True
+        try:        
+            self.writeExperimentHeader(_exDir, _e)
+            e_ = self.parseExperiment(_exDir)
+            if e_ is None:
+                return False
+            self.saveExperimentFile(_exDir, e_)
+            for k in self.experimentExportKeys:
+                os.remove(_exDir + '/{}.bin'.format(k))
+            os.remove(_exDir + '/' + self.experimentFileName)
+            self.catalogExperiment(_exDir, e_)
+        except IOError:
+            print("IOError file \'{}\'".format(_exDir))            
+            flag = False
+        return flag
+    
+    def getCatalog(self, _experimentDir):
+        
+        return ExperimentCatalog(_experimentDir + '/' + ExperimentCatalog.fileName)
+    
+    def catalogExperiment(self, _exDir, _e):
+        
+        # the catalog lives in the experiment folder, next to the model folders;
+        # the experiment is saved even if it cannot be indexed
+        try:
+            self.getCatalog(os.path.dirname(os.path.dirname(_exDir))).add(_e)
+        except sqlite3.Error as err:
+            print("Warning: the experiment catalog could not be updated ({})".format(err))
+        
+    def saveExperimentFile(self, _exDir, _e):
+        
+        # the columns may be views over a larger preallocated buffer or over 
+        # the stream files, they are written into the container without stacking
+        columns = {}
+        for k in self.experimentExportKeys:
+            columns[k] = _e[k]
+        meta = self.experimentMeta(_e)
+        meta.pop('layout', None)
+        ExperimentFile.write(_exDir + '/' + ExperimentFile.fileName, meta, columns)
+    
+    def streamColumnLoader(self, _path, _k, _layout, _n):
+        
+        dtype, width = _layout[_k]
+        fname = _path + '/{}.bin'.format(_k)
+        def load():
+            if _n == 0:
+                return np.zeros((0, width), dtype=dtype)
+            return np.memmap(fname, dtype=dtype, mode='r', shape=(_n, width))
+        return load
+    
+    def npyColumnLoader(self, _path, _k):
+        
+        def load():
+            return np.load(_path + '/{}.npy'.format(_k), mmap_mode='r')
+        return load
+        
     def parseExperiment(self,_path):
         
-        e_ = {}
+        # only the header is read, the columns are mapped when first accessed
+        cName = _path + '/' + ExperimentFile.fileName
+        if self.fileExists(cName):
+            try:
+                e_ = ExperimentFile(cName).open()
+            except (IOError, ValueError):
+                print("IOError file \'{}\'".format(cName))            
+                return None
+            for k in self.experimentKeys:
+                if not k in e_:
+                    return None
+            return e_
+            
+        meta = {}
         li = 0 
         fname = _path + '/' + self.experimentFileName
-        #print(fname)
         try:        
             with open(fname) as f:             
                 for line in f:                                        
                     if '#' in line or len(line) <= 1:
                         continue                    
+                    if li >= len(self.experimentKeys):
+                        # optional entries following the mandatory ones
+                        k, sep, v = line.rstrip('\n').partition('=')
+                        if len(sep) > 0:
+                            meta[k] = v
+                        continue
                     k = self.experimentKeys[li]
                     i = len(k)+1                           
                     if (line[:i]) == k + '=': 
-                        e_[k] = line[i:-1]
+                        meta[k] = line[i:-1]
                         li = li + 1            
             if li < len(self.experimentKeys):
-                e_ = None
+                return None
+            
+            loaders = {}
+            if 'layout' in meta:
+                # streamed experiment, possibly interrupted: all the columns are 
+                # cut to the number of rows completely written
+                layout = {}
+                for c in meta['layout'].split(';'):
+                    k, dtype, width = c.split(':')
+                    layout[k] = (np.dtype(dtype), int(width))
+                n = None
+                for k in self.experimentExportKeys:
+                    dtype, width = layout[k]
+                    nk = os.path.getsize(_path + '/{}.bin'.format(k)) // (dtype.itemsize * width)
+                    if n is None or nk < n:
+                        n = nk
+                for k in self.experimentExportKeys:
+                    loaders[k] = self.streamColumnLoader(_path, k, layout, n)
+                if 'partial' in meta:
+                    meta['numbertimes'] = '{}'.format(n)
             else:                                
-                e_['cur_pos'] = np.load(_path + '/cur_pos.npy')
-                e_['tgt_pos'] = np.load(_path  + '/tgt_pos.npy')
-                e_['hum_pos'] = np.load(_path + '/hum_pos.npy')
-                e_['hum_int'] = np.load(_path + '/hum_int.npy')
-                e_['states'] = np.load(_path  + '/states.npy')
-                e_['elbo'] = np.load(_path  + '/elbo.npy')                
+                for k in self.experimentExportKeys:
+                    loaders[k] = self.npyColumnLoader(_path, k)
         except IOError:
             print("IOError dir \'{}\'".format(_path))            
             return None        
-        return e_
+        return ExperimentData(meta, loaders)
 
     def exportExperimentCsv(self,_expPath, _savePath):
                 
@@ -514,6 +815,7 @@ class Utils():
             
     def removeFile(self,_fname):
         
+        self.cache.invalidate(_fname)
         try:
             if self.fileExists(_fname):
                 os.remove(_fname)        
@@ -538,8 +840,26 @@ class Utils():
         return flag
 
 
+    def createUniqueDir(self, _dir, _name):
+        
+        # several processes may save within the same second, os.mkdir is atomic
+        # so the first one keeps the name and the others get a numbered suffix
+        name = _name
+        n = 0
+        while True:
+            try:
+                os.mkdir(_dir + '/' + name)
+                return name
+            except FileExistsError:
+                n = n + 1
+                name = '{}_{}'.format(_name, n)
+            except OSError:
+                print ("Dir \'%s\' creation failed" % (_dir + '/' + name))
+                return None
+
     def removeDir(self,_dir): 
         
+        self.cache.invalidate(_dir)
         flag = True        
         try:        
             if self.isDir(_dir):
@@ -556,23 +876,25 @@ class Utils():
     
     def saveData(self,_fname, _X): 
                
+        # the whole matrix is formatted in one call with the format of its 
+        # dtype, booleans are written as True/False
         flag = True
         try:        
-            with open(_fname, 'w') as writeFile:
-                writer = csv.writer(writeFile, delimiter=self.delimiter)
-                for i in range(_X.shape[0]):       
-                    line = []
-                    x_i = _X[i,:]
-                    for j in range(_X.shape[1]):
-                        line.append(str(x_i[j]))                            
-                    writer.writerow(line)
-                
-            writeFile.close()
+            np.savetxt(_fname, _X, fmt=self.dataFormat(_X), delimiter=self.delimiter)
         except IOError:
             flag = False
             print("IOError file \'{}\'".format(_fname))
         return flag
     
+    def dataFormat(self, _X):
+        
+        k = np.asarray(_X).dtype
+        if k.kind in self.dataFormats:
+            return self.dataFormats[k.kind]
+        if k.kind == 'f' and k.itemsize <= 4:
+            return self.dataFormats['f4']
+        return self.dataFormats['f8']
+    
     def parseString(self, _string, _dtype='float', _delim=' '):  
         
         list_ = []
@@ -591,29 +913,39 @@ class Utils():
     
         
     def readData(self,_fname, _type="float", _delimiter=' '):
+        
+        # the file is parsed into an array by the C reader of pandas in one call
+        try:
+            if _type == "bool":
+                df = pd.read_csv(_fname, sep=_delimiter, header=None, dtype=str, keep_default_na=False)
+                return df.to_numpy() == "1"
+            df = pd.read_csv(_fname, sep=_delimiter, header=None, dtype=np.float64, float_precision='round_trip')
+            return df.to_numpy()
+        
+        except pd.errors.EmptyDataError:
+            return np.array([])
+        except pd.errors.ParserError:
+            # rows of different lengths, read one by one into an object array
+            return self.readRows(_fname, _type, _delimiter)
+        except IOError:
+            print("IOError file \'{}\'".format(_fname))
             
-        def toFloat(_v):
-            return float(_v)
+        return None
     
-        def toBool(_v):
-            return _v == "1"
+    def readRows(self, _fname, _type="float", _delimiter=' '):
         
         try:
-            ifile = open(_fname, "r")        
-            reader = csv.reader(ifile, delimiter=_delimiter)
-            data = []    
-            func = toFloat
-            if _type == "bool":
-                func = toBool
-            for row in reader:
-                coord = []     
-                for col in row:
-                    coord.append(func(col))        
-                data.append(coord)
-            ifile.close()
-            X = np.array(data)
+            with open(_fname, "r") as f:
+                rows = []
+                for row in csv.reader(f, delimiter=_delimiter):
+                    if _type == "bool":
+                        rows.append([v == "1" for v in row])
+                    else:
+                        rows.append([float(v) for v in row])
+            X = np.empty((len(rows),), dtype=object)
+            for i, row in enumerate(rows):
+                X[i] = row
             return X
-        
         except IOError:
             print("IOError file \'{}\'".format(_fname))
             
@@ -627,42 +959,4 @@ class Utils():
         except ValueError:
             print("ValueError converting to int \'{}\'".format(_str))
         return i
-                        
-    def readDataRobust(self,_fname, _type="float", _delimiter=' '):
-            
-        def toFloat(_v):
-            return float(_v)
-    
-        def toBool(_v):
-            return _v == "1"
-        
-        try:
-            ifile = open(_fname, "r")        
-            reader = csv.reader(ifile, delimiter=_delimiter)
-            data = []    
-            func = toFloat
-            if _type == "bool":
-                func = toBool
-            count = 0    
-            for row in reader:
-                if count == 0:
-                    count = 1
-                    continue
-                
-                coord = []     
-                for col in row:
-                    try:
-                        coord.append(func(col))  
-                    except ValueError:
-                        pass
-                    #    print('NaN')
-                    #coord.append(float(col))        
-                data.append(coord)
-            ifile.close()
-            X = np.array(data)
-            return X
-        except IOError:
-            print("IOError file \'{}\'".format(_fname))
-            
-        return None
 